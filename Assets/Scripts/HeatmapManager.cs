@@ -15,6 +15,7 @@ public class HeatmapManager : MonoBehaviour
     public float maxTemp = 45.0f;
 
     private WebSocketConnector connector;
+    private Color[] palette; // Colour table received from Python, indexed by RackData.color_index
 
     void Start()
     {
@@ -52,13 +53,28 @@ public class HeatmapManager : MonoBehaviour
 
     private void OnDataReceived(SimulationState state)
     {
+        // JsonUtility fills in missing nested objects/arrays, so branch on the message type
+        if (state != null && state.type == "palette")
+        {
+            if (state.palette != null && state.palette.colors != null && state.palette.colors.Length > 0)
+                LoadPalette(state.palette);
+            return;
+        }
         if (!useHeatmap || state == null || state.racks == null) return;
 
         Color[] newColors = new Color[state.racks.Count];
 
         for (int i = 0; i < state.racks.Count; i++)
         {
-            // Normalize temperature to 0-1 range for gradient evaluation
+            int index = state.racks[i].color_index;
+            if (palette != null && index >= 0 && index < palette.Length)
+            {
+                // Same quantized colour table as the Python dashboard
+                newColors[i] = palette[index] * heatmapIntensity;
+                continue;
+            }
+
+            // Fallback: normalize temperature to 0-1 range for gradient evaluation
             float temp = state.racks[i].temperature;
             float t = Mathf.InverseLerp(minTemp, maxTemp, temp);
             
@@ -73,6 +89,18 @@ public class HeatmapManager : MonoBehaviour
         }
     }
 
+    private void LoadPalette(HeatmapPalette source)
+    {
+        palette = new Color[source.colors.Length];
+        for (int i = 0; i < palette.Length; i++)
+        {
+            int rgb = source.colors[i];
+            palette[i] = new Color32((byte)(rgb >> 16), (byte)(rgb >> 8), (byte)rgb, 255);
+        }
+        minTemp = source.min_temp;
+        maxTemp = source.max_temp;
+    }
+
     // Fallback for random generation if needed
     public Color[] GenerateHeatmapColors(int count)
     {
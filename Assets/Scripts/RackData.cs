@@ -9,11 +9,22 @@ public class RackData
     public float temperature; // Value between 0 and 1 (or actual temp to be normalized)
     public float energy_usage;
     public string status; // "Normal", "Warning", "Critical"
+    public int color_index = -1; // Index into the HeatmapPalette sent on connect (-1 = not sent)
+}
+
+[Serializable]
+public class HeatmapPalette
+{
+    public float min_temp;
+    public float max_temp;
+    public float resolution; // Degrees C per palette entry
+    public int[] colors; // Packed 0xRRGGBB
 }
 
 [Serializable]
 public class SimulationState
 {
+    public string type; // "palette" or "tick" (empty from older senders = tick)
     public List<RackData> racks;
     public float timestamp;
     
@@ -25,4 +36,7 @@ public class SimulationState
     public float total_compute_output;
     public float projected_daily_cost;
     public string cooling_strategy;
+
+    // Only meaningful on the "palette" message sent when the client connects
+    public HeatmapPalette palette;
 }
@@ -29,6 +29,7 @@ public class SimulationUI : MonoBehaviour
 
     void OnDataReceived(SimulationState state)
     {
+        if (state == null || state.type == "palette") return; // Palette messages carry no metrics
         currentState = state;
     }
 
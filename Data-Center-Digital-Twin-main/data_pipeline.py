@@ -1,53 +1,172 @@
 import json
+import os
 import random
+import hashlib
+import numpy as np
 from collections import defaultdict
 
+from ingest.stream_json import iter_json_records
+from simulation.rack_state import RackStateArray
+
 class ScenarioCombinator:
     """Creates random workload plans for all machines."""
-    def __init__(self, num_machines=700, scenarios_per_machine=5):
+    def __init__(self, num_machines=700, scenarios_per_machine=5, rng=None):
         self.num_machines = num_machines
         self.scenarios_per_machine = scenarios_per_machine
+        self.rng = rng # Optional numpy Generator for reproducible plans
         print("Scenario Combinator initialized.")
 
     def generate_random_combination_plan(self):
         """Returns a list of random scenario choices (e.g., [3, 1, 5...])."""
+        if self.rng is not None:
+            return self.rng.integers(1, self.scenarios_per_machine + 1, size=self.num_machines)
         return [random.randint(1, self.scenarios_per_machine) for _ in range(self.num_machines)]
 
 class DataIngestor:
     """Reads the data file and serves states based on the Combinator's plan."""
-    def __init__(self, filepath='data/datacenter_full_state_list.json'):
+    FIELDS = RackStateArray.FIELDS
+    CACHE_VERSION = 1
+
+    def __init__(self, filepath='data/datacenter_full_state_list.json', use_cache=True):
         try:
-            with open(filepath, 'r') as f:
-                flat_data_list = json.load(f)
-            
+            if use_cache and self._load_cache(filepath):
+                print(f"Data Ingestor loaded {len(self.machine_ids)} machines from binary cache.")
+                return
+
+            # Stream the records so only the per-machine field values are kept in memory
             grouped_scenarios = defaultdict(list)
-            for record in flat_data_list:
+            for record in iter_json_records(filepath):
                 entity_id = record['meta_data']['entityId']
-                grouped_scenarios[entity_id].append(record)
+                payload = record['payload']
+                grouped_scenarios[entity_id].append(tuple(payload[field] for field in self.FIELDS))
 
-            self.scenarios = dict(grouped_scenarios)
-            self.machine_ids = sorted(list(self.scenarios.keys()))
+            self.machine_ids = sorted(list(grouped_scenarios.keys()))
+            self._build_scenario_tensor(grouped_scenarios)
             
             print(f"Data Ingestor loaded and grouped {len(self.machine_ids)} machines successfully.")
 
+            if use_cache:
+                self._write_cache(filepath)
+
         except FileNotFoundError:
             print(f"[bold red]Error: '{filepath}' not found.[/bold red]")
             exit()
 
-    def get_state_from_plan(self, combination_plan):
-        """Builds the full datacenter state from the combination plan."""
-        datacenter_state = []
-        for i, machine_id in enumerate(self.machine_ids):
-            num_available = len(self.scenarios.get(machine_id, []))
-            if num_available == 0:
-                continue
+    # --- Binary snapshot cache ---
+    # The compiled tensor is stored next to the source as data/.cache/<source name>/.
+    # It is valid while the source's size and mtime are unchanged; if only the mtime
+    # moved, the source's SHA-256 decides whether the cache can be reused.
 
-            safe_index = (combination_plan[i] - 1) % num_available
-            scenario_data = self.scenarios[machine_id][safe_index]
-            
-            datacenter_state.append({
-                "meta_data": scenario_data['meta_data'],
-                "payload": scenario_data['payload']
+    @staticmethod
+    def _cache_dir(filepath):
+        directory, filename = os.path.split(os.path.abspath(filepath))
+        return os.path.join(directory, ".cache", filename)
+
+    @staticmethod
+    def _file_sha256(filepath, chunk_size=1 << 20):
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load_cache(self, filepath):
+        """Memory-maps the cached tensor if it matches the source file. Returns True on success."""
+        cache_dir = self._cache_dir(filepath)
+        manifest_path = os.path.join(cache_dir, "manifest.json")
+        try:
+            source_stat = os.stat(filepath)
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if manifest.get("version") != self.CACHE_VERSION or manifest.get("fields") != list(self.FIELDS):
+            return False
+        if manifest.get("source_size") != source_stat.st_size:
+            return False
+        if manifest.get("source_mtime_ns") != source_stat.st_mtime_ns:
+            # Touched but maybe not changed: fall back to the content hash
+            if manifest.get("source_sha256") != self._file_sha256(filepath):
+                return False
+            manifest["source_mtime_ns"] = source_stat.st_mtime_ns
+            self._write_manifest(manifest_path, manifest)
+
+        try:
+            self.scenario_tensor = np.load(os.path.join(cache_dir, "scenario_tensor.npy"), mmap_mode='r')
+            self.scenario_counts = np.load(os.path.join(cache_dir, "scenario_counts.npy"))
+        except (OSError, ValueError) as e:
+            print(f"Data Ingestor: ignoring unreadable cache ({e}).")
+            return False
+
+        self.machine_ids = manifest["machine_ids"]
+        self._machine_rows = np.arange(len(self.machine_ids))
+        return True
+
+    def _write_cache(self, filepath):
+        """Writes the compiled tensor next to the source. Failures only cost the speed-up."""
+        cache_dir = self._cache_dir(filepath)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            source_stat = os.stat(filepath)
+            for name, array in (("scenario_tensor.npy", self.scenario_tensor),
+                                ("scenario_counts.npy", self.scenario_counts)):
+                tmp_path = os.path.join(cache_dir, name + ".tmp")
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp_path, os.path.join(cache_dir, name))
+
+            # The manifest goes last: its presence is what marks the cache as complete.
+            self._write_manifest(os.path.join(cache_dir, "manifest.json"), {
+                "version": self.CACHE_VERSION,
+                "fields": list(self.FIELDS),
+                "source_size": source_stat.st_size,
+                "source_mtime_ns": source_stat.st_mtime_ns,
+                "source_sha256": self._file_sha256(filepath),
+                "machine_ids": self.machine_ids,
             })
-        return datacenter_state
+        except OSError as e:
+            print(f"Data Ingestor: could not write cache ({e}).")
+
+    @staticmethod
+    def _write_manifest(manifest_path, manifest):
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def _build_scenario_tensor(self, grouped_scenarios):
+        """
+        Packs the grouped payload values into a dense (num_machines, scenarios_per_machine, num_fields)
+        tensor. Machines with fewer scenarios have their slots padded by wrapping around,
+        and self.scenario_counts keeps the real count for the plan's modulo indexing.
+        """
+        num_scenarios = max(len(payloads) for payloads in grouped_scenarios.values())
+        self.scenario_tensor = np.empty((len(self.machine_ids), num_scenarios, len(self.FIELDS)), dtype=np.float64)
+        self.scenario_counts = np.empty(len(self.machine_ids), dtype=np.intp)
+
+        for m, machine_id in enumerate(self.machine_ids):
+            payloads = grouped_scenarios[machine_id]
+            self.scenario_counts[m] = len(payloads)
+            for s in range(num_scenarios):
+                self.scenario_tensor[m, s] = payloads[s % len(payloads)]
+
+        self._machine_rows = np.arange(len(self.machine_ids))
+
+    def get_state_from_plan(self, combination_plan, out=None):
+        """
+        Builds the full datacenter state from the combination plan.
+
+        Returns a RackStateArray indexed like self.machine_ids. Pass a previously
+        returned state as `out` to refill it in place instead of allocating.
+        """
+        state = out if out is not None else RackStateArray(self.machine_ids)
+        plan = np.asarray(combination_plan)[:len(self.machine_ids)]
+        scenario_index = np.mod(plan - 1, self.scenario_counts)
 
+        # One gather for the whole fleet: (num_machines, num_fields)
+        selected = self.scenario_tensor[self._machine_rows, scenario_index]
+        state.workload[:] = selected[:, 0]
+        state.inlet[:] = selected[:, 1]
+        state.ambient[:] = selected[:, 2]
+        return state
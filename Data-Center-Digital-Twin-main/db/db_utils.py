@@ -1,22 +1,263 @@
 import sqlite3
-from typing import List, Tuple
+import time
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
 
 DEFAULT_DB = "db/telemetry.db"
+DEFAULT_CHUNK_SIZE = 5000
+
+COLUMNS = ["entity_type", "entity_id", "timestamp_utc", "server_workload_percent", "inlet_temp_c", "ambient_temp_c"]
+INSERT_SQL = f"INSERT INTO telemetry ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+# --- Time-series layout ---
+# timestamp_utc holds integer epoch seconds. Every insert into `telemetry` is folded
+# by a trigger into per-minute/hour/day rollup tables, once per rack and once for
+# the whole fleet (entity_id = FLEET_ENTITY_ID), so history queries read buckets
+# instead of raw samples.
+METRIC_COLUMNS = ["server_workload_percent", "inlet_temp_c", "ambient_temp_c"]
+ROLLUP_GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+FLEET_ENTITY_ID = "__fleet__"
+# Per metric: non-NULL sample count, min, max, avg
+ROLLUP_METRIC_NAMES = [f"{c}_{stat}" for c in METRIC_COLUMNS for stat in ("count", "min", "max", "avg")]
+
+TELEMETRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS telemetry (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity_type TEXT, entity_id TEXT NOT NULL, timestamp_utc INTEGER NOT NULL,
+  server_workload_percent REAL, inlet_temp_c REAL, ambient_temp_c REAL
+);
+CREATE INDEX IF NOT EXISTS idx_telemetry_entity_time ON telemetry(entity_id, timestamp_utc);
+CREATE INDEX IF NOT EXISTS idx_telemetry_time ON telemetry(timestamp_utc);
+"""
+
+# One row per simulation tick: the fleet aggregates plus every rack's outlet
+# temperature packed as a float32 BLOB (rack order), enough to replay the run.
+TICK_COLUMNS = ["timestamp_utc", "step", "total_server_power_kw", "total_cooling_power_kw", "average_pue",
+                "max_outlet_temp_c", "total_daily_cost_usd", "total_compute_output", "cooling_strategy", "outlet_temps"]
+INSERT_TICK_SQL = f"INSERT INTO simulation_ticks ({', '.join(TICK_COLUMNS)}) VALUES ({', '.join('?' * len(TICK_COLUMNS))})"
+
+SIMULATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS simulation_ticks (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  timestamp_utc INTEGER NOT NULL, step INTEGER,
+  total_server_power_kw REAL, total_cooling_power_kw REAL, average_pue REAL, max_outlet_temp_c REAL,
+  total_daily_cost_usd REAL, total_compute_output REAL, cooling_strategy TEXT,
+  outlet_temps BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_simulation_ticks_time ON simulation_ticks(timestamp_utc);
+"""
+
+def rollup_table(granularity: str) -> str:
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity: {granularity}")
+    return f"telemetry_rollup_{granularity}"
 
-COLUMNS = ["entity_id", "server_workload_percent", "inlet_temp_c", "ambient_temp_c"]
-INSERT_SQL = "INSERT INTO telemetry (entity_id, server_workload_percent, inlet_temp_c, ambient_temp_c) VALUES (?, ?, ?, ?)"
+def _rollup_schema() -> Tuple[str, str]:
+    """Builds the rollup tables and the trigger that keeps them up to date."""
+    metric_defs = ", ".join(f"{c}_count INTEGER NOT NULL, {c}_min REAL, {c}_max REAL, {c}_avg REAL"
+                            for c in METRIC_COLUMNS)
+    metric_names = ", ".join(ROLLUP_METRIC_NAMES)
+    metric_values = ", ".join(f"NEW.{c} IS NOT NULL, NEW.{c}, NEW.{c}, NEW.{c}" for c in METRIC_COLUMNS)
+    # NULL metrics are skipped like the min()/max()/avg() aggregates of rebuild_rollups do:
+    # {c}_count counts the non-NULL samples and the running average
+    # avg + (x - avg) / (n + 1) only advances when x is present. The right-hand sides see the old row.
+    metric_updates = ", ".join(
+        f"{c}_count = {c}_count + excluded.{c}_count, "
+        f"{c}_min = coalesce(min({c}_min, excluded.{c}_min), {c}_min, excluded.{c}_min), "
+        f"{c}_max = coalesce(max({c}_max, excluded.{c}_max), {c}_max, excluded.{c}_max), "
+        f"{c}_avg = CASE WHEN excluded.{c}_avg IS NULL THEN {c}_avg "
+        f"ELSE coalesce({c}_avg, 0) + (excluded.{c}_avg - coalesce({c}_avg, 0)) / ({c}_count + 1) END"
+        for c in METRIC_COLUMNS
+    )
 
-def get_conn(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    statements = []
+    upserts = []
+    for granularity, seconds in ROLLUP_GRANULARITIES.items():
+        table = rollup_table(granularity)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"entity_id TEXT NOT NULL, bucket_start INTEGER NOT NULL, sample_count INTEGER NOT NULL, "
+            f"{metric_defs}, PRIMARY KEY (entity_id, bucket_start)) WITHOUT ROWID;"
+        )
+        for entity in ("NEW.entity_id", f"'{FLEET_ENTITY_ID}'"):
+            upserts.append(
+                f"INSERT INTO {table} (entity_id, bucket_start, sample_count, {metric_names}) "
+                f"VALUES ({entity}, (NEW.timestamp_utc / {seconds}) * {seconds}, 1, {metric_values}) "
+                f"ON CONFLICT (entity_id, bucket_start) DO UPDATE SET "
+                f"sample_count = sample_count + 1, {metric_updates};"
+            )
+
+    trigger = (
+        "CREATE TRIGGER IF NOT EXISTS trg_telemetry_rollup AFTER INSERT ON telemetry BEGIN\n"
+        + "\n".join(upserts) + "\nEND;"
+    )
+    return "\n".join(statements), trigger
+
+ROLLUP_TABLES_SCHEMA, ROLLUP_TRIGGER_SQL = _rollup_schema()
+SCHEMA = TELEMETRY_SCHEMA + SIMULATION_SCHEMA + ROLLUP_TABLES_SCHEMA + "\n" + ROLLUP_TRIGGER_SQL
+
+# Tuned for write-heavy ingest: WAL lets readers run during bulk loads, and with WAL
+# synchronous=NORMAL only fsyncs at checkpoints instead of on every commit.
+BULK_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536", # 64 MiB page cache
+)
+
+def get_conn(db_path: str = DEFAULT_DB, wal: bool = False) -> sqlite3.Connection:
     conn = sqlite3.connect(db_path, timeout=15)
     conn.row_factory = sqlite3.Row
+    if wal:
+        configure_bulk_pragmas(conn)
     return conn
 
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Creates the telemetry table, indexes, rollup tables and trigger if missing."""
+    migrate = _has_outdated_rollups(conn)
+    if migrate:
+        with conn:
+            conn.execute("DROP TRIGGER IF EXISTS trg_telemetry_rollup")
+            for granularity in ROLLUP_GRANULARITIES:
+                conn.execute(f"DROP TABLE IF EXISTS {rollup_table(granularity)}")
+    conn.executescript(SCHEMA)
+    conn.commit()
+    if migrate:
+        ts_min, ts_max = conn.execute("SELECT min(timestamp_utc), max(timestamp_utc) FROM telemetry").fetchone()
+        if ts_min is not None:
+            rebuild_rollups(conn, ts_min, ts_max)
+
+def _has_outdated_rollups(conn: sqlite3.Connection) -> bool:
+    """True when the rollup tables predate the per-metric non-NULL counts."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({rollup_table('minute')})")}
+    return bool(columns) and f"{METRIC_COLUMNS[0]}_count" not in columns
+
+def is_legacy_schema(conn: sqlite3.Connection) -> bool:
+    """True for databases created with the old text-timestamp/raw_json layout."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(telemetry)")}
+    return "raw_json" in columns
+
+def configure_bulk_pragmas(conn: sqlite3.Connection) -> None:
+    """Switches the connection to WAL journaling and the bulk-ingest pragmas."""
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+
 def insert_telemetry_row(conn: sqlite3.Connection, row: Tuple) -> int:
     cur = conn.cursor()
     cur.execute(INSERT_SQL, row)
     conn.commit()
     return cur.lastrowid
 
+def insert_telemetry_rows(conn: sqlite3.Connection, rows: Iterable[Tuple],
+                          chunk_size: int = DEFAULT_CHUNK_SIZE, defer_rollups: bool = False) -> Dict[str, float]:
+    """
+    Bulk-inserts telemetry rows with executemany, one transaction per chunk.
+
+    `rows` may be any iterable (e.g. a generator), it is consumed chunk by chunk.
+    If a chunk fails, it is rolled back and retried row by row so that only the
+    bad rows are skipped. With defer_rollups=True the rollup trigger is disabled
+    during the load, which is much faster for large imports. The trigger is
+    database-wide, so rows written meanwhile by other connections (e.g. the
+    TelemetryRecorder) miss it too: when the load ends, successfully or not, the
+    trigger is restored and the rollups are rebuilt over the time span of every
+    row inserted while it was off, not just this batch. Returns {"rows",
+    "failed", "seconds", "rows_per_sec"}.
+    """
+    rows = iter(rows)
+    inserted = 0
+    failed = 0
+    start = time.perf_counter()
+    if defer_rollups:
+        # AUTOINCREMENT ids only grow: everything above this was inserted without the trigger
+        last_id_before = conn.execute("SELECT coalesce(max(id), 0) FROM telemetry").fetchone()[0]
+        with conn:
+            conn.execute("DROP TRIGGER IF EXISTS trg_telemetry_rollup")
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            try:
+                with conn:
+                    conn.executemany(INSERT_SQL, chunk)
+                inserted += len(chunk)
+            except sqlite3.Error:
+                with conn:
+                    for row in chunk:
+                        try:
+                            conn.execute(INSERT_SQL, row)
+                            inserted += 1
+                        except sqlite3.Error as e:
+                            failed += 1
+                            print(f"Failed to insert record: {e}")
+    finally:
+        if defer_rollups:
+            _restore_rollups(conn, last_id_before)
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": inserted,
+        "failed": failed,
+        "seconds": seconds,
+        "rows_per_sec": inserted / seconds if seconds > 0 else float(inserted),
+    }
+
+def _restore_rollups(conn: sqlite3.Connection, last_id_before: int) -> None:
+    """Recreates the rollup trigger and re-aggregates every row inserted after `last_id_before`."""
+    if conn.in_transaction:
+        conn.rollback() # A load interrupted mid-chunk
+    with conn:
+        conn.execute(ROLLUP_TRIGGER_SQL)
+    # Rows inserted from here on have the trigger; rebuilding their buckets from raw data stays correct
+    ts_min, ts_max = conn.execute(
+        "SELECT min(timestamp_utc), max(timestamp_utc) FROM telemetry WHERE id > ?", (last_id_before,)
+    ).fetchone()
+    if ts_min is not None:
+        rebuild_rollups(conn, ts_min, ts_max)
+
+def rebuild_rollups(conn: sqlite3.Connection, since: int, until: int) -> None:
+    """Recomputes every rollup bucket overlapping [since, until] from the raw telemetry."""
+    aggregates = ", ".join(f"count({c}), min({c}), max({c}), avg({c})" for c in METRIC_COLUMNS)
+    columns = f"entity_id, bucket_start, sample_count, {', '.join(ROLLUP_METRIC_NAMES)}"
+    with conn:
+        for granularity, seconds in ROLLUP_GRANULARITIES.items():
+            table = rollup_table(granularity)
+            first_bucket = (int(since) // seconds) * seconds
+            end = (int(until) // seconds + 1) * seconds
+            conn.execute(f"DELETE FROM {table} WHERE bucket_start >= ? AND bucket_start < ?", (first_bucket, end))
+            for entity in ("entity_id", f"'{FLEET_ENTITY_ID}'"):
+                conn.execute(
+                    f"INSERT INTO {table} ({columns}) SELECT {entity}, (timestamp_utc / {seconds}) * {seconds} AS bucket, "
+                    f"count(*), {aggregates} FROM telemetry WHERE timestamp_utc >= ? AND timestamp_utc < ? "
+                    f"GROUP BY 1, 2", (first_bucket, end)
+                )
+
+def get_entity_history(conn: sqlite3.Connection, entity_id: str,
+                       since: int = None, until: int = None) -> List[sqlite3.Row]:
+    """Raw samples for one entity in [since, until), served by the (entity_id, timestamp_utc) index."""
+    sql = f"SELECT {', '.join(COLUMNS)} FROM telemetry WHERE entity_id = ? AND timestamp_utc >= ? AND timestamp_utc < ? ORDER BY timestamp_utc"
+    cur = conn.execute(sql, (entity_id, since if since is not None else -2**63, until if until is not None else 2**63 - 1))
+    return cur.fetchall()
+
+def get_rollup_history(conn: sqlite3.Connection, granularity: str = "minute", entity_id: str = FLEET_ENTITY_ID,
+                       since: int = None, until: int = None) -> List[sqlite3.Row]:
+    """Pre-aggregated buckets (min/max/avg per metric) for a rack, or the fleet by default."""
+    sql = f"SELECT * FROM {rollup_table(granularity)} WHERE entity_id = ? AND bucket_start >= ? AND bucket_start < ? ORDER BY bucket_start"
+    cur = conn.execute(sql, (entity_id, since if since is not None else -2**63, until if until is not None else 2**63 - 1))
+    return cur.fetchall()
+
+def get_tick_history(conn: sqlite3.Connection, since: int = None, until: int = None) -> List[sqlite3.Row]:
+    """Recorded simulation ticks in [since, until), oldest first. See decode_outlet_temps for the BLOB."""
+    sql = f"SELECT id, {', '.join(TICK_COLUMNS)} FROM simulation_ticks WHERE timestamp_utc >= ? AND timestamp_utc < ? ORDER BY id"
+    cur = conn.execute(sql, (since if since is not None else -2**63, until if until is not None else 2**63 - 1))
+    return cur.fetchall()
+
+def decode_outlet_temps(blob: bytes) -> np.ndarray:
+    """Unpacks the per-rack outlet temperatures stored with a simulation tick."""
+    return np.frombuffer(blob, dtype=np.float32)
+
 def get_all_scenarios(conn: sqlite3.Connection) -> List[sqlite3.Row]:
     """Fetches all initial payload data needed for the simulation."""
     cur = conn.cursor()
@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from db.db_utils import (DEFAULT_DB, INSERT_SQL, INSERT_TICK_SQL, TICK_COLUMNS, ensure_schema, get_conn,
+                         is_legacy_schema)
+
+# Aggregated-result keys stored per tick (everything between step and the outlet BLOB)
+TICK_RESULT_KEYS = TICK_COLUMNS[2:-1]
+
+class TelemetryRecorder:
+    """
+    Write-behind recorder that persists simulation ticks to the telemetry DB.
+
+    record_tick() only snapshots the tick into a bounded in-memory queue and
+    returns; a background thread drains the queue in batches, one transaction
+    per batch covering both the tick rows and their per-rack telemetry. When
+    the writer falls behind, the oldest pending ticks are dropped (and counted)
+    so memory stays bounded and the caller never blocks. Once close() was
+    called, or the writer gave up, further ticks are ignored.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB, max_pending_ticks=200, batch_size=20,
+                 flush_interval_s=2.0, record_racks=True, entity_type="datacenter_rack"):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.record_racks = record_racks
+        self.entity_type = entity_type
+
+        self.written_ticks = 0
+        self.dropped_ticks = 0
+        self.enabled = True
+
+        self._pending = deque(maxlen=max_pending_ticks)
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="TelemetryRecorder", daemon=True)
+        self._thread.start()
+        print(f"Telemetry recorder writing to '{db_path}'.")
+
+    def record_tick(self, step, aggregated_results, entity_ids, workloads, inlets, ambients, outlet_temps,
+                    timestamp=None):
+        """Queues one tick. The per-rack arrays are copied, so callers may reuse their buffers."""
+        if not self.enabled or self._stopping:
+            return
+        tick = (
+            int(timestamp if timestamp is not None else time.time()),
+            step,
+            tuple(aggregated_results.get(key) for key in TICK_RESULT_KEYS),
+            entity_ids,
+            np.array(workloads, dtype=np.float64),
+            np.array(inlets, dtype=np.float64),
+            np.array(ambients, dtype=np.float64),
+            np.asarray(outlet_temps, dtype=np.float32).tobytes(),
+        )
+        with self._cond:
+            if not self.enabled or self._stopping:
+                return # Closed while the tick was being copied
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped_ticks += 1 # deque(maxlen) discards the oldest tick
+            self._pending.append(tick)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def on_tick(self, tick):
+        """SimulationEngine subscriber: records a published tick."""
+        self.record_tick(
+            tick["step"], tick["aggregated_results"], tick["entity_ids"],
+            tick["workloads"], tick["inlets"], tick["ambients"], tick["outlet_temps"],
+            timestamp=tick["timestamp"]
+        )
+
+    def close(self, timeout=5.0):
+        """Flushes what is still queued and stops the writer thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        conn = None
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = get_conn(self.db_path, wal=True)
+            if is_legacy_schema(conn):
+                print(f"Telemetry recorder disabled: '{self.db_path}' uses the old layout (re-run init_db.py).")
+                self._disable()
+                return
+            ensure_schema(conn)
+
+            while True:
+                with self._cond:
+                    if not self._stopping and len(self._pending) < self.batch_size:
+                        self._cond.wait(self.flush_interval_s)
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                    stopping = self._stopping and not self._pending
+                if batch:
+                    self._write_batch(conn, batch)
+                if stopping:
+                    break
+        except Exception as e:
+            # Anything reaching here ends the writer thread, so stop accepting ticks too
+            print(f"Telemetry recorder disabled: {type(e).__name__}: {e}")
+            self._disable()
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _disable(self):
+        with self._cond:
+            self.enabled = False
+            self.dropped_ticks += len(self._pending)
+            self._pending.clear()
+
+    def _write_batch(self, conn, batch):
+        try:
+            # One transaction: a batch is stored with all of its rack rows or not at all
+            with conn:
+                conn.executemany(INSERT_TICK_SQL, (
+                    (ts, step, *results, outlet_blob)
+                    for ts, step, results, _, _, _, _, outlet_blob in batch
+                ))
+                if self.record_racks:
+                    conn.executemany(INSERT_SQL, (
+                        (self.entity_type, entity_id, ts, w, i, a)
+                        for ts, _, _, entity_ids, workloads, inlets, ambients, _ in batch
+                        for entity_id, w, i, a in zip(entity_ids, workloads.tolist(), inlets.tolist(), ambients.tolist())
+                    ))
+            self.written_ticks += len(batch)
+        except sqlite3.Error as e:
+            print(f"Telemetry recorder: failed to write {len(batch)} ticks: {e}")
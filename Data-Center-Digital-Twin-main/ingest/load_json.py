@@ -1,39 +1,38 @@
 import os
 import sys
-import json
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from db.db_utils import get_conn, insert_telemetry_row
+from db.db_utils import get_conn, insert_telemetry_rows
 from ingest.normalizer import normalize_doc, record_tuple_from_normalized
+from ingest.stream_json import iter_json_records
 
 DB_PATH = "db/telemetry.db"
 INPUT = "data/sample.json"
+CHUNK_SIZE = 5000 # Rows per executemany/transaction
+
+def iter_row_tuples(docs):
+    """Normalizes a stream of documents into DB row tuples, skipping bad records."""
+    for doc in docs:
+        try:
+            yield record_tuple_from_normalized(normalize_doc(doc))
+        except Exception as e:
+            print(f"Failed to normalize record: {e}")
 
 def main():
     if not os.path.exists(INPUT):
         print(f"Input JSON not found: {INPUT}")
         return
 
-    with open(INPUT, "r") as f:
-        data = json.load(f)
-
-    docs = data if isinstance(data, list) else [data]
-    conn = get_conn(DB_PATH)
-    inserted = 0
-    for doc in docs:
-        try:
-            normalized = normalize_doc(doc)
-            row_tuple = record_tuple_from_normalized(normalized)
-            insert_telemetry_row(conn, row_tuple)
-            inserted += 1
-        except Exception as e:
-            print(f"Failed to insert record: {e}")
+    # Generator pipeline: records are parsed, normalized and inserted as the file is read
+    rows = iter_row_tuples(iter_json_records(INPUT))
+    conn = get_conn(DB_PATH, wal=True)
+    stats = insert_telemetry_rows(conn, rows, chunk_size=CHUNK_SIZE, defer_rollups=True)
     conn.close()
-    print(f"Inserted {inserted} records into {DB_PATH}")
+    print(f"Inserted {stats['rows']} records into {DB_PATH} "
+          f"in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
 
 if __name__ == "__main__":
     main()
-
@@ -1,6 +1,18 @@
 import json
+from datetime import datetime, timezone
 from typing import Dict
 
+def to_epoch_seconds(value) -> int:
+    """Converts an ISO-8601 string (e.g. '2025-01-01T00:00:00Z') or a number to integer epoch seconds."""
+    if value is None:
+        return int(datetime.now(timezone.utc).timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
 def normalize_doc(doc: Dict) -> Dict:
     """Extracts only the required payload fields for initial DB insertion."""
     if not isinstance(doc, dict):
@@ -8,7 +20,9 @@ def normalize_doc(doc: Dict) -> Dict:
     meta = doc.get("meta_data", {})
     payload = doc.get("payload", {})
     return {
+        "entity_type": meta.get("entityType"),
         "entity_id": meta.get("entityId"),
+        "timestamp_utc": to_epoch_seconds(meta.get("timestamp")),
         "server_workload_percent": payload.get("server_workload_percent"),
         "inlet_temp_c": payload.get("inlet_temp_c"),
         "ambient_temp_c": payload.get("ambient_temp_c"),
@@ -17,7 +31,9 @@ def normalize_doc(doc: Dict) -> Dict:
 def record_tuple_from_normalized(normalized: Dict) -> tuple:
     """Converts normalized dict to a tuple for DB insertion."""
     return (
+        normalized.get("entity_type"),
         normalized.get("entity_id"),
+        normalized.get("timestamp_utc"),
         normalized.get("server_workload_percent"),
         normalized.get("inlet_temp_c"),
         normalized.get("ambient_temp_c"),
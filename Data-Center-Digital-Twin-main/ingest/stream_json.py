@@ -0,0 +1,90 @@
+import json
+import re
+from typing import Any, Iterator
+
+_WHITESPACE = " \t\r\n"
+# Characters that can continue a number, up to the end of the buffer
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*\Z")
+
+def iter_json_records(filepath: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks of `chunk_size` characters and only the record
+    currently being decoded is held in memory, so multi-GB exports can be
+    processed as they are read. A file holding a single top-level object
+    yields that object.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r') as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk # Drop the consumed prefix to keep memory bounded
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return
+
+        skip_whitespace()
+        if pos >= len(buf):
+            return
+
+        if buf[pos] != '[':
+            # Not an array: decode the single document that makes up the file
+            while not eof:
+                fill()
+            yield decoder.raw_decode(buf, pos)[0]
+            return
+
+        pos += 1
+        expect_value = True
+        while True:
+            skip_whitespace()
+            if pos >= len(buf):
+                raise ValueError(f"Unexpected end of file in JSON array: {filepath}")
+            if buf[pos] == ']':
+                return
+            if buf[pos] == ',':
+                if expect_value:
+                    raise ValueError(f"Unexpected ',' in JSON array at offset {pos}: {filepath}")
+                pos += 1
+                expect_value = True
+                continue
+            if not expect_value:
+                raise ValueError(f"Expected ',' or ']' in JSON array at offset {pos}: {filepath}")
+
+            # Decode the next element, reading more data until it is complete.
+            # A value ending at the buffer end could still be truncated, and so
+            # could a number followed only by characters that may continue it
+            # ("24." decodes as 24): those are only accepted once more data or
+            # EOF follows.
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buf, pos)
+                    if eof:
+                        break
+                    is_number = isinstance(record, (int, float)) and not isinstance(record, bool)
+                    if end < len(buf) and not (is_number and _NUMBER_TAIL.match(buf, end)):
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+            pos = end
+            expect_value = False
+            yield record
@@ -1,30 +1,25 @@
 import sqlite3
 import os
 
+from db.db_utils import ensure_schema, is_legacy_schema
+
 DB_PATH = "db/telemetry.db"
 os.makedirs("db", exist_ok=True)
 
-schema = """
-CREATE TABLE IF NOT EXISTS telemetry (
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  entity_type TEXT, entity_id TEXT, timestamp_utc TEXT,
-  server_workload_percent REAL, inlet_temp_c REAL, ambient_temp_c REAL,
-  raw_json TEXT
-);
-CREATE INDEX IF NOT EXISTS idx_telemetry_entity ON telemetry(entity_id);
-"""
-
 def main():
     if os.path.exists(DB_PATH):
-        print(f"Database '{DB_PATH}' already exists. Skipping initialization.")
+        conn = sqlite3.connect(DB_PATH)
+        if is_legacy_schema(conn):
+            print(f"Database '{DB_PATH}' uses the old telemetry layout. Delete it and re-run to upgrade.")
+        else:
+            ensure_schema(conn) # Idempotent: adds any missing indexes/rollups
+            print(f"Database '{DB_PATH}' already exists. Schema is up to date.")
+        conn.close()
         return
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.executescript(schema)
-    conn.commit()
+    ensure_schema(conn)
     conn.close()
     print("Initialized DB at", DB_PATH)
 
 if __name__ == "__main__":
     main()
-
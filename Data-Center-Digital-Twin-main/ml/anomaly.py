@@ -0,0 +1,63 @@
+import numpy as np
+from scipy.stats import chi2
+
+class StreamingAnomalyDetector:
+    """
+    Incremental Mahalanobis anomaly detector.
+
+    Keeps an exponentially weighted mean and covariance of the feature vector
+    and scores each new sample by its squared Mahalanobis distance to them,
+    flagging it when the distance exceeds the chi-square quantile for the
+    number of features. Every update is O(d^2) and needs no history, so it
+    can run on every tick, and on many streams at once: samples of shape
+    (n_streams, n_features) are scored and learned independently per stream
+    (e.g. one stream per rack).
+
+    predict() follows the IsolationForest convention: -1 = anomaly, 1 = normal.
+    """
+
+    def __init__(self, n_features, n_streams=1, alpha=0.02, quantile=0.995, warmup=20, variance_floor=1e-3):
+        self.n_features = n_features
+        self.n_streams = n_streams
+        self.alpha = alpha
+        self.warmup = warmup
+        self.variance_floor = variance_floor # Relative to the feature level, keeps constant inputs invertible
+        self.threshold = chi2.ppf(quantile, n_features)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = np.zeros((self.n_streams, self.n_features))
+        self.cov = np.zeros((self.n_streams, self.n_features, self.n_features))
+
+    def _as_samples(self, x):
+        return np.asarray(x, dtype=float).reshape(self.n_streams, self.n_features)
+
+    def score(self, x):
+        """Squared Mahalanobis distance of each stream's sample (NaN while warming up)."""
+        x = self._as_samples(x)
+        if self.count < self.warmup:
+            return np.full(self.n_streams, np.nan)
+        delta = x - self.mean
+        floor = (self.variance_floor * np.abs(self.mean)) ** 2 + 1e-12
+        cov = self.cov + floor[:, :, None] * np.eye(self.n_features)
+        return np.einsum('ki,ki->k', delta, np.linalg.solve(cov, delta[:, :, None])[:, :, 0])
+
+    def update(self, x):
+        """Scores the sample against the current model, then learns it. Returns the scores."""
+        x = self._as_samples(x)
+        scores = self.score(x)
+        self.count += 1
+        # Plain running average until the window fills, exponential weighting after
+        alpha = max(self.alpha, 1.0 / self.count)
+        delta = x - self.mean
+        self.mean += alpha * delta
+        self.cov = (1 - alpha) * (self.cov + alpha * delta[:, :, None] * delta[:, None, :])
+        return scores
+
+    def predict(self, x):
+        """-1 for streams whose sample is anomalous, 1 otherwise (does not learn the sample)."""
+        return np.where(self.score(x) > self.threshold, -1, 1)
+
+    def is_anomaly(self, scores):
+        return np.nan_to_num(scores, nan=0.0) > self.threshold
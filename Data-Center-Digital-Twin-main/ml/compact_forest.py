@@ -0,0 +1,110 @@
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+class CompactForest:
+    """
+    A regression forest flattened into a few NumPy arrays.
+
+    All trees' nodes are concatenated: `feature`/`threshold` hold the split,
+    `children` the global child indices (row 0 = right, row 1 = left, so the
+    split outcome indexes it directly), `value` the node prediction and
+    `roots` the root node of each tree. Leaves point to themselves, so
+    max_depth steps land every sample on its leaf without leaf checks.
+
+    Loading memory-maps the arrays (milliseconds, no unpickling, no
+    scikit-learn needed), and prediction walks every sample down every tree
+    at once, one NumPy step per tree level.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, feature_names, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.feature_names = list(feature_names)
+        self.max_depth = max_depth
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model, feature_names=None):
+        """Flattens a fitted sklearn RandomForestRegressor (single output)."""
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(tree.node_count) + offset
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            threshold.append(tree.threshold.astype(np.float64))
+            left.append(np.where(is_leaf, own_index, tree.children_left + offset).astype(np.int64))
+            right.append(np.where(is_leaf, own_index, tree.children_right + offset).astype(np.int64))
+            value.append(tree.value[:, 0, 0].astype(np.float64))
+            max_depth = max(max_depth, tree.max_depth)
+            offset += tree.node_count
+        if feature_names is None:
+            feature_names = list(getattr(model, 'feature_names_in_', range(model.n_features_in_)))
+        children = np.stack([np.concatenate(right), np.concatenate(left)])
+        return cls(np.concatenate(feature), np.concatenate(threshold), children,
+                   np.concatenate(value), np.asarray(roots, dtype=np.int64),
+                   [str(name) for name in feature_names], int(max_depth))
+
+    def save(self, path):
+        """Writes the arrays as .npy files plus a manifest into directory `path`."""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "manifest.json"), 'w') as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "feature_names": self.feature_names,
+                "max_depth": self.max_depth,
+                "n_trees": self.n_trees,
+            }, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact forest version {manifest.get('version')} in {path}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in ARRAYS}
+        return cls(feature_names=manifest["feature_names"], max_depth=manifest["max_depth"], **arrays)
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, "manifest.json"))
+
+    def predict(self, X, n_trees=None):
+        """
+        Mean prediction of the first `n_trees` trees (all by default) for each
+        row of X (array in feature_names order, or a DataFrame). Matches
+        sklearn, which also compares float32 features against the thresholds.
+        """
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy()
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        roots = self.roots[:n_trees] if n_trees else self.roots
+
+        # Features stored column-major, so one flat gather fetches each sample's split feature
+        n_samples, n_nodes = len(X), len(self.value)
+        columns = X.T.ravel()
+        sample_index = np.arange(n_samples)[None, :]
+        children = self.children.reshape(-1)
+        # (n_trees, n_samples) current node of every sample in every tree
+        nodes = np.repeat(np.asarray(roots, dtype=np.int64)[:, None], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            go_left = columns[self.feature[nodes] * n_samples + sample_index] <= self.threshold[nodes]
+            nodes = children[go_left * n_nodes + nodes]
+        return self.value[nodes].mean(axis=0)
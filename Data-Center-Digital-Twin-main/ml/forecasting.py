@@ -0,0 +1,79 @@
+import numpy as np
+
+class OnlineARForecaster:
+    """
+    AR(1)-with-intercept forecaster updated by recursive least squares.
+
+    Each observation updates the coefficients in O(1) (a 2x2 covariance
+    update), so the model can follow the series every tick without refitting.
+    A forgetting factor below 1 discounts old samples so the model tracks
+    drifting workloads. Values are modelled relative to an anchor level to
+    keep the regression well conditioned for large features (kW, USD).
+
+    `reseed` replaces the coefficients with those of a full fit (e.g. a
+    periodic background ARIMA refit); online updates continue from there.
+    """
+    MAX_PHI = 0.99 # Keeps multi-step forecasts stable (mean-reverting)
+
+    def __init__(self, forgetting_factor=0.98, initial_covariance=1000.0):
+        self.forgetting_factor = forgetting_factor
+        self.initial_covariance = initial_covariance
+        self.reset()
+
+    def reset(self):
+        self.theta = np.zeros(2) # [intercept, phi], on anchored values
+        self.P = np.eye(2) * self.initial_covariance
+        self.anchor = None
+        self.last_value = None
+        self.nobs = 0
+
+    def update(self, value):
+        """Adds one observation and updates the coefficients."""
+        value = float(value)
+        if not np.isfinite(value):
+            return
+        if self.anchor is None:
+            self.anchor = value
+        y = value - self.anchor
+        if self.last_value is not None:
+            x = np.array([1.0, self.last_value - self.anchor])
+            Px = self.P @ x
+            gain = Px / (self.forgetting_factor + x @ Px)
+            self.theta += gain * (y - x @ self.theta)
+            self.P = (self.P - np.outer(gain, Px)) / self.forgetting_factor
+        self.last_value = value
+        self.nobs += 1
+
+    def reseed(self, mean, phi, confidence=10.0):
+        """
+        Adopts the parameters of a full fit: the process mean and AR(1)
+        coefficient (ARIMA's 'const' and 'ar.L1'). `confidence` sets how
+        strongly the reseeded coefficients resist the following updates.
+        """
+        if self.anchor is None:
+            self.anchor = mean
+        phi = float(np.clip(phi, -self.MAX_PHI, self.MAX_PHI))
+        self.theta = np.array([(mean - self.anchor) * (1 - phi), phi])
+        self.P = np.eye(2) / confidence
+
+    def forecast(self, steps):
+        """Returns the next `steps` predicted values as a list."""
+        if self.last_value is None:
+            return []
+        intercept, phi = self.theta[0], float(np.clip(self.theta[1], -self.MAX_PHI, self.MAX_PHI))
+        y = self.last_value - self.anchor
+        forecast = np.empty(steps)
+        for i in range(steps):
+            y = intercept + phi * y
+            forecast[i] = y
+        return (forecast + self.anchor).tolist()
+
+
+def fit_arima_params(values):
+    """
+    Full ARIMA(1,0,0) fit of a series, for reseeding an OnlineARForecaster.
+    Returns (mean, phi). Slow: meant to run off the simulation thread.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+    params = ARIMA(np.asarray(values, dtype=float), order=(1, 0, 0)).fit().params
+    return float(params[0]), float(params[1])
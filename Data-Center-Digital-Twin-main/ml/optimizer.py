@@ -0,0 +1,269 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from twin.digital_twin_engine import DataCenterTwin
+
+PROFILES = ("balanced", "greedy", "sustainable")
+
+def profile_reward(profile, cost, compute):
+    """Turns predicted cost and compute into the reward maximized for a profile."""
+    if profile == "greedy":
+        # Maximize compute, ignore cost
+        return compute
+    if profile == "sustainable":
+        # Maximize 1 / cost (i.e., minimize cost)
+        return 1 / (cost + 1) # +1 to avoid divide-by-zero
+    # "balanced": maximize compute-per-dollar (default)
+    return compute / (cost + 1)
+
+
+_physics = DataCenterTwin()
+
+def physics_objective(profile, ambient, inlets, workloads, fidelity=1.0):
+    """
+    Reward of each candidate setting computed by the twin physics itself
+    (same daily cost and compute targets the surrogate models are trained on).
+    Exact and cheap, so `fidelity` is ignored.
+    """
+    results = _physics.compute_batch(workloads, inlets, np.full(len(inlets), ambient, dtype=float))
+    cost = (results['calculated_server_power_watts'] + results['cooling_unit_power_watts']) / 1000 \
+           * _physics.COST_PER_KWH_USD * 24
+    return profile_reward(profile, cost, results['compute_output'])
+
+def solve_physics_settings(ambient, profile, inlet_range=(15, 30), workload_range=(20, 100)):
+    """
+    Exact optimum of physics_objective over the integer slider domain without
+    a full grid: for each workload only the inlets next to the physics
+    breakpoints (and the domain bounds) can be optimal, so only those are
+    evaluated. Ties resolve like the grid search (lowest inlet, then workload).
+    """
+    workloads = np.arange(workload_range[0], workload_range[1] + 1)
+    breakpoints = _physics.inlet_breakpoints(workloads, np.full(len(workloads), ambient, dtype=float))
+    candidates = np.column_stack([
+        np.floor(breakpoints), np.ceil(breakpoints),
+        np.full(len(workloads), inlet_range[0]), np.full(len(workloads), inlet_range[1]),
+    ])
+    candidates = np.clip(candidates, inlet_range[0], inlet_range[1]).astype(np.int64)
+
+    # Unique (inlet, workload) pairs in grid order
+    keys = np.unique(candidates * 1000 + workloads[:, None])
+    inlets, workloads = keys // 1000, keys % 1000
+    rewards = np.asarray(physics_objective(profile, ambient, inlets, workloads), dtype=float)
+    best = int(np.argmax(rewards))
+    return {
+        'inlet': int(inlets[best]),
+        'workload': int(workloads[best]),
+        'reward_score': float(rewards[best]),
+        'evaluations': float(len(keys))
+    }
+
+
+class SettingsOptimizer:
+    """
+    Deterministic search for the best (inlet, workload) setting at a given
+    ambient temperature, over the integer slider domain.
+
+    `objective(ambient, inlets, workloads, fidelity)` must return one reward
+    per candidate (higher is better). `fidelity` in (0, 1] lets cheap, rough
+    evaluations be requested (e.g. a subset of a forest's trees); objectives
+    without a cheaper approximation can ignore it.
+
+    Modes:
+      "grid"               - every integer point (strided evenly if that
+                             exceeds the budget)
+      "coarse_to_fine"     - coarse grid, then repeatedly a finer grid around
+                             the best point until the step is 1
+      "successive_halving" - all grid points at low fidelity, then keep the
+                             best 1/eta at eta times the fidelity until full
+    `budget` caps the number of evaluations; a low-fidelity evaluation costs
+    its fidelity. None means no cap.
+    """
+    MODES = ("grid", "coarse_to_fine", "successive_halving")
+
+    def __init__(self, objective, inlet_range=(15, 30), workload_range=(20, 100),
+                 mode="grid", budget=None, coarse_points=6, halving_eta=3, min_fidelity=0.1):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown optimizer mode '{mode}', expected one of {self.MODES}")
+        self.objective = objective
+        self.inlet_range = inlet_range
+        self.workload_range = workload_range
+        self.mode = mode
+        self.budget = budget
+        self.coarse_points = coarse_points
+        self.halving_eta = halving_eta
+        self.min_fidelity = min_fidelity
+
+    @property
+    def grid_size(self):
+        return (self.inlet_range[1] - self.inlet_range[0] + 1) * (self.workload_range[1] - self.workload_range[0] + 1)
+
+    def search(self, ambient, mode=None, budget=None, objective=None):
+        """
+        Returns {'inlet', 'workload', 'reward_score', 'evaluations'} for the
+        best setting found, or None if the budget allows no evaluation.
+        `objective` overrides the optimizer's objective for this search only.
+        Searches keep no state on the optimizer, so they may run concurrently.
+        """
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown optimizer mode '{mode}', expected one of {self.MODES}")
+        budget = self.budget if budget is None else budget
+        run = _SearchRun(objective or self.objective, ambient, math.inf if budget is None else budget)
+
+        if mode == "grid":
+            self._grid_search(run)
+        elif mode == "coarse_to_fine":
+            self._coarse_to_fine(run)
+        else:
+            self._successive_halving(run)
+
+        if run.best is None:
+            return None
+        inlet, workload, reward, _ = run.best
+        return {
+            'inlet': inlet,
+            'workload': workload,
+            'reward_score': reward,
+            'evaluations': run.spent
+        }
+
+    # --- Grid helpers ---
+
+    @staticmethod
+    def _axis(low, high, step):
+        """Integer points from low to high with the given step, always including both ends."""
+        points = np.arange(low, high + 1, max(1, step))
+        if points[-1] != high:
+            points = np.append(points, high)
+        return points
+
+    def _mesh(self, inlet_axis, workload_axis):
+        inlets, workloads = np.meshgrid(inlet_axis, workload_axis, indexing='ij')
+        return inlets.ravel(), workloads.ravel()
+
+    # --- Modes ---
+
+    def _grid_search(self, run):
+        (i_lo, i_hi), (w_lo, w_hi) = self.inlet_range, self.workload_range
+        step = 1
+        if run.budget < self.grid_size:
+            # Thin both axes evenly so the strided grid fits in the budget; both ends
+            # are always kept, so a budget below the 4 corners is cut short by run.evaluate
+            step = math.ceil(math.sqrt(self.grid_size / max(run.budget, 1)))
+            max_step = max(i_hi - i_lo, w_hi - w_lo, 1)
+            while step < max_step and \
+                    len(self._axis(i_lo, i_hi, step)) * len(self._axis(w_lo, w_hi, step)) > run.budget:
+                step += 1
+        run.evaluate(*self._mesh(self._axis(i_lo, i_hi, step), self._axis(w_lo, w_hi, step)))
+
+    def _coarse_to_fine(self, run):
+        (i_lo, i_hi), (w_lo, w_hi) = self.inlet_range, self.workload_range
+        i_step = max(1, (i_hi - i_lo) // (self.coarse_points - 1))
+        w_step = max(1, (w_hi - w_lo) // (self.coarse_points - 1))
+        while True:
+            if run.evaluate(*self._mesh(self._axis(i_lo, i_hi, i_step), self._axis(w_lo, w_hi, w_step))) is None:
+                return
+            if i_step == 1 and w_step == 1:
+                return
+            # Zoom in on one step around the best point so far, at half the step
+            inlet, workload = run.best[:2]
+            i_lo, i_hi = max(self.inlet_range[0], inlet - i_step), min(self.inlet_range[1], inlet + i_step)
+            w_lo, w_hi = max(self.workload_range[0], workload - w_step), min(self.workload_range[1], workload + w_step)
+            i_step, w_step = max(1, i_step // 2), max(1, w_step // 2)
+
+    def _successive_halving(self, run):
+        inlets, workloads = self._mesh(np.arange(self.inlet_range[0], self.inlet_range[1] + 1),
+                                       np.arange(self.workload_range[0], self.workload_range[1] + 1))
+        eta = self.halving_eta
+        # Start low enough that the full-fidelity round sees only a handful of candidates
+        rounds = max(0, math.ceil(math.log(len(inlets), eta)) - 1)
+        fidelity = max(self.min_fidelity, eta ** -rounds)
+        while True:
+            fidelity = min(1.0, fidelity)
+            evaluated = run.evaluate(inlets, workloads, fidelity)
+            if evaluated is None or fidelity >= 1.0:
+                return
+            inlets, workloads, rewards = evaluated
+            # Keep the best 1/eta (stable sort keeps ties in grid order)
+            keep = max(1, len(inlets) // eta)
+            order = np.argsort(-rewards, kind='stable')[:keep]
+            inlets, workloads = inlets[order], workloads[order]
+            fidelity *= eta
+
+
+class SuggestionCache:
+    """
+    Thread-safe LRU cache of optimizer suggestions.
+
+    Keys are (profile, ambient rounded to `ambient_step`, model_version), so
+    nearby ambient temperatures share one entry and suggestions from older
+    models are never returned after a reload.
+    """
+
+    def __init__(self, max_entries=512, ambient_step=0.5):
+        self.max_entries = max_entries
+        self.ambient_step = ambient_step
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, ambient):
+        """The ambient temperature a suggestion is cached (and computed) for."""
+        return round(round(ambient / self.ambient_step) * self.ambient_step, 6)
+
+    def key(self, profile, ambient, model_version):
+        return (profile, self.quantize(ambient), model_version)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _SearchRun:
+    """Budget and best-so-far bookkeeping for one SettingsOptimizer.search call."""
+
+    def __init__(self, objective, ambient, budget):
+        self.objective = objective
+        self.ambient = ambient
+        self.budget = budget
+        self.spent = 0.0
+        self.best = None # (inlet, workload, reward, fidelity)
+
+    def evaluate(self, inlets, workloads, fidelity=1.0):
+        """Evaluates as many candidates as the remaining budget allows."""
+        if self.budget != math.inf:
+            affordable = int((self.budget - self.spent) / fidelity + 1e-9)
+            if affordable <= 0:
+                return None
+            inlets, workloads = inlets[:affordable], workloads[:affordable]
+        rewards = np.asarray(self.objective(self.ambient, inlets, workloads, fidelity), dtype=float)
+        self.spent += len(inlets) * fidelity
+        # Best so far, preferring full-fidelity results over rough ones
+        best = int(np.argmax(rewards))
+        if self.best is None or (fidelity, rewards[best]) > (self.best[3], self.best[2]):
+            self.best = (int(inlets[best]), int(workloads[best]), float(rewards[best]), fidelity)
+        return inlets, workloads, rewards
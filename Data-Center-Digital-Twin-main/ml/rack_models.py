@@ -0,0 +1,117 @@
+import numpy as np
+
+# Outlet temperature bands (°C), shared by the rack statuses, the fleet KPIs and the UI
+WARNING_TEMP_C = 35.5
+CRITICAL_TEMP_C = 37.0
+
+class RackModelBank:
+    """
+    Per-rack baselines, anomaly scores and forecasts for the whole fleet.
+
+    Every rack has a Holt (level + trend) exponential smoother over its outlet
+    temperature and an EWMA of its one-step prediction residuals. Each tick:
+      - the residual of the new reading against its prediction is turned into
+        a z-score using the rack's own residual variance,
+      - level, trend and variance are updated,
+      - `horizon` steps are forecast from the new level and trend.
+    Everything is a handful of in-place NumPy operations over the rack
+    dimension (no per-rack Python), so 10k racks cost well under a millisecond.
+
+    Statuses combine the fixed outlet thresholds with the models: a rack
+    that deviates strongly from its own baseline (either way), or is forecast
+    to go critical within the horizon, is flagged even if it is not hot yet;
+    a strong upward deviation is critical.
+    """
+    STATUS_NORMAL, STATUS_WARNING, STATUS_CRITICAL = 0, 1, 2
+    STATUS_LABELS = ("Normal", "Warning", "Critical")
+
+    WARNING_TEMP_C = WARNING_TEMP_C
+    CRITICAL_TEMP_C = CRITICAL_TEMP_C
+
+    def __init__(self, n_racks, alpha=0.2, beta=0.05, residual_alpha=0.05, horizon=5,
+                 z_warning=3.0, z_critical=5.0, warmup=10):
+        self.n_racks = n_racks
+        self.alpha = alpha                   # Level smoothing
+        self.beta = beta                     # Trend smoothing
+        self.residual_alpha = residual_alpha # Residual variance smoothing
+        self.horizon = horizon
+        self.z_warning = z_warning
+        self.z_critical = z_critical
+        self.warmup = warmup
+
+        self.level = np.zeros(n_racks)
+        self.trend = np.zeros(n_racks)
+        self.residual_var = np.zeros(n_racks)
+        self.zscores = np.zeros(n_racks)
+        self.forecast = np.zeros((n_racks, horizon))
+        self.status = np.zeros(n_racks, dtype=np.int8)
+        self.flagged = np.zeros(n_racks, dtype=bool) # Raised by the models, not by temperature alone
+        self.count = 0
+
+        self._steps = np.arange(1, horizon + 1, dtype=float)
+        self._residual = np.empty(n_racks)
+        self._scratch = np.empty(n_racks)
+        self._previous_level = np.empty(n_racks)
+
+    def update(self, temps):
+        """Feeds one reading per rack. Returns the status codes (int8 array, reused)."""
+        temps = np.asarray(temps, dtype=float)
+        if self.count == 0:
+            self.level[:] = temps
+            self.count = 1
+            self._classify(temps)
+            return self.status
+
+        residual, scratch = self._residual, self._scratch
+        # One-step prediction error and its z-score against the rack's own history
+        np.add(self.level, self.trend, out=scratch)
+        np.subtract(temps, scratch, out=residual)
+        if self.count > self.warmup:
+            np.sqrt(self.residual_var, out=self.zscores)
+            np.maximum(self.zscores, 1e-3, out=self.zscores)
+            np.divide(residual, self.zscores, out=self.zscores)
+
+        # Residual variance (EWMA of squared residuals)
+        self.residual_var *= 1 - self.residual_alpha
+        self.residual_var += self.residual_alpha * residual * residual
+
+        # Holt update: scratch holds level + trend, the prior prediction
+        np.copyto(self._previous_level, self.level)
+        np.multiply(temps, self.alpha, out=self.level)
+        scratch *= 1 - self.alpha
+        self.level += scratch
+        np.subtract(self.level, self._previous_level, out=scratch)
+        scratch *= self.beta
+        self.trend *= 1 - self.beta
+        self.trend += scratch
+
+        # Short-horizon forecasts: level + h * trend for h = 1..horizon
+        np.multiply(self.trend[:, None], self._steps[None, :], out=self.forecast)
+        self.forecast += self.level[:, None]
+
+        self.count += 1
+        self._classify(temps)
+        return self.status
+
+    def _classify(self, temps):
+        status = self.status
+        status.fill(self.STATUS_NORMAL)
+        status[temps > self.WARNING_TEMP_C] = self.STATUS_WARNING
+        status[temps > self.CRITICAL_TEMP_C] = self.STATUS_CRITICAL
+        self.flagged.fill(False)
+        if self.count <= self.warmup:
+            return
+        np.copyto(self._scratch, status)
+        model_warning = (np.abs(self.zscores) > self.z_warning) | (self.forecast[:, -1] > self.CRITICAL_TEMP_C)
+        status[model_warning & (status == self.STATUS_NORMAL)] = self.STATUS_WARNING
+        status[self.zscores > self.z_critical] = self.STATUS_CRITICAL
+        np.greater(status, self._scratch, out=self.flagged)
+
+    def anomalous_racks(self):
+        """Indices of racks deviating from their own baseline by more than z_warning."""
+        if self.count <= self.warmup:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(np.abs(self.zscores) > self.z_warning)
+
+    def status_labels(self):
+        return [self.STATUS_LABELS[code] for code in self.status.tolist()]
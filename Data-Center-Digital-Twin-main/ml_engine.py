@@ -1,113 +1,258 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from statsmodels.tsa.arima.model import ARIMA
 import warnings
 import joblib
 import os
+import threading
+from functools import partial
 from collections import deque # Import deque
 
+from ml.forecasting import OnlineARForecaster
+from ml.anomaly import StreamingAnomalyDetector
+from ml_worker import MLWorker
+from ml.compact_forest import CompactForest
+from ml.optimizer import (SettingsOptimizer, SuggestionCache, profile_reward, physics_objective,
+                          solve_physics_settings, PROFILES)
+
 # Suppress harmless warnings from statsmodels
 warnings.filterwarnings("ignore")
 
 class MLEngine:
     """
     Encapsulates all Machine Learning logic for the Digital Twin.
+
+    anomaly_mode selects the anomaly detector:
+      "streaming" - incremental Mahalanobis model updated every tick (default)
+      "forest"    - IsolationForest retrained in the background every
+                    forest_retrain_interval ticks
+
+    Full refits are handed to an MLWorker (thread or process pool, see
+    worker_pool); each tick only reads the worker's latest snapshot.
+
+    optimizer_backend selects what the settings optimizer evaluates:
+      "surrogate" - the trained cost/compute RandomForests (models/)
+      "physics"   - the twin physics directly; needs no trained models and,
+                    with the default mode, is solved exactly at the physics
+                    breakpoints
     """
+    ANOMALY_MODES = ("streaming", "forest")
+    OPTIMIZER_BACKENDS = ("surrogate", "physics")
     
     # --- MODIFIED: __init__ ---
-    def __init__(self, forecast_features, anomaly_features, forecast_steps=30):
+    def __init__(self, forecast_features, anomaly_features, forecast_steps=30, forecast_refit_interval=50,
+                 anomaly_mode="streaming", forest_retrain_interval=100, worker_pool="thread",
+                 optimizer_mode="grid", optimizer_budget=None, suggestion_ambient_step=0.5,
+                 optimizer_backend="surrogate"):
+        if anomaly_mode not in self.ANOMALY_MODES:
+            raise ValueError(f"Unknown anomaly_mode '{anomaly_mode}', expected one of {self.ANOMALY_MODES}")
+        if optimizer_backend not in self.OPTIMIZER_BACKENDS:
+            raise ValueError(f"Unknown optimizer_backend '{optimizer_backend}', expected one of {self.OPTIMIZER_BACKENDS}")
         
         # 1. Set ml_ready to True immediately
         self.ml_ready = True 
         self.history_buffer = deque(maxlen=200) # Use a deque for history
         
-        # 2. Initialize models right away
-        self.anomaly_detector = IsolationForest(contamination=0.05, random_state=42)
-        self.forecasters = {}
-        
         self.forecast_features = forecast_features
         self.anomaly_features = anomaly_features
         self.forecast_steps = forecast_steps
         
+        # Full refits (ARIMA, IsolationForest) run here, never on the simulation thread
+        self.worker = MLWorker(pool=worker_pool)
+        self._forecast_version = 0
+        
+        # 2. Initialize models right away
+        # --- Anomaly detection ---
+        self.anomaly_mode = anomaly_mode
+        self.last_anomaly_score = np.nan
+        if anomaly_mode == "streaming":
+            self.anomaly_detector = StreamingAnomalyDetector(len(anomaly_features))
+        else:
+            self.anomaly_detector = None # Set once the first background fit finishes
+        self.forest_retrain_interval = forest_retrain_interval
+        self._ticks_since_forest_fit = 0
+        
+        # --- Forecasting: online AR models updated every tick ---
+        self.forecasters = {feature: OnlineARForecaster() for feature in forecast_features}
+        # Full ARIMA refits run in the background every N ticks and reseed the online models
+        self.forecast_refit_interval = forecast_refit_interval
+        self._ticks_since_refit = 0
+        
         # --- Optimizer (no change) ---
         self.optimizer_ready = False
         self.cost_model = None
         self.compute_model = None
         self.optimizer_features = ['ambient_temp_c', 'inlet_temp_c', 'server_workload_percent']
+        self.optimizer_backend = optimizer_backend
+        self.optimizer = SettingsOptimizer(self._objective_for("balanced"),
+                                           mode=optimizer_mode, budget=optimizer_budget)
+        # Suggestions are memoized per (profile, quantized ambient, model version)
+        self.model_version = 0
+        self.suggestion_cache = SuggestionCache(ambient_step=suggestion_ambient_step)
+        self._precompute_thread = None
         
-        self._load_optimizer_models()
+        if optimizer_backend == "physics":
+            # Nothing to load: the physics is the model
+            self.optimizer_ready = True
+            self.model_version = 1
+            print("ML OPTIMIZER: Using the twin physics directly.")
+        else:
+            self._load_optimizer_models()
 
     def _load_optimizer_models(self):
-        """Loads the pre-trained optimizer models from disk."""
+        """
+        Loads the pre-trained optimizer models from disk, preferring the
+        compact memory-mapped export over the pickled forests.
+        """
         cost_path = "models/optimizer_cost.joblib"
         compute_path = "models/optimizer_compute.joblib"
+        cost_dir = "models/optimizer_cost"
+        compute_dir = "models/optimizer_compute"
         
+        if CompactForest.exists(cost_dir) and CompactForest.exists(compute_dir):
+            try:
+                self.cost_model = CompactForest.load(cost_dir)
+                self.compute_model = CompactForest.load(compute_dir)
+                self.optimizer_ready = True
+                self.model_version += 1
+                self.suggestion_cache.clear()
+                print("ML OPTIMIZER: Compact models loaded successfully.")
+                return
+            except Exception as e:
+                print(f"ML OPTIMIZER: Error loading compact models, falling back to joblib: {e}")
+
         if os.path.exists(cost_path) and os.path.exists(compute_path):
             try:
                 self.cost_model = joblib.load(cost_path)
                 self.compute_model = joblib.load(compute_path)
                 self.optimizer_ready = True
+                self.model_version += 1
+                self.suggestion_cache.clear()
                 print("ML OPTIMIZER: Models loaded successfully.")
             except Exception as e:
                 print(f"ML OPTIMIZER: Error loading models: {e}")
         else:
             print("ML OPTIMIZER: Warning! Optimizer models not found. Run train_optimizer.py")
             
+    def reload_optimizer_models(self):
+        """Reloads the optimizer models from disk and drops all cached suggestions."""
+        if self.optimizer_backend == "physics":
+            self.suggestion_cache.clear()
+            return True
+        self._load_optimizer_models()
+        return self.optimizer_ready
+
     # --- MODIFIED: The "Finder" Function ---
-    def find_best_settings(self, current_ambient_temp, profile="balanced", num_samples=1000):
+    def find_best_settings(self, current_ambient_temp, profile="balanced", mode=None, budget=None):
         """
         Uses the loaded models to find the optimal settings for the given ambient temp
-        based on the selected optimization profile.
+        based on the selected optimization profile. The search is deterministic
+        (see SettingsOptimizer for the modes and budget).
+
+        With the default mode and budget, the search runs at the ambient
+        rounded to the cache step and is memoized, so repeated calls at a
+        similar ambient return instantly.
         """
         if not self.optimizer_ready:
             return None
 
-        print(f"ML OPTIMIZER: Searching for '{profile}' settings at {current_ambient_temp:.1f}°C ambient...")
-        
-        # 1. Create a "search space" DataFrame
-        search_data = {
-            'ambient_temp_c': np.full(num_samples, current_ambient_temp),
-            'inlet_temp_c': np.random.uniform(15, 30, num_samples),
-            'server_workload_percent': np.random.uniform(20, 100, num_samples) # Assume we want at least 20% work
-        }
-        search_df = pd.DataFrame(search_data)[self.optimizer_features]
-
-        # 2. Predict cost and compute for all samples
-        pred_cost = self.cost_model.predict(search_df)
-        pred_compute = self.compute_model.predict(search_df)
-
-        # 3. --- NEW: Find the best "reward" based on the profile ---
-        if profile == "greedy":
-            # Maximize compute, ignore cost
-            reward = pred_compute
-        elif profile == "sustainable":
-            # Maximize 1 / cost (i.e., minimize cost)
-            reward = 1 / (pred_cost + 1) # +1 to avoid divide-by-zero
-        else: # "balanced"
-            # Maximize compute-per-dollar (default)
-            reward = pred_compute / (pred_cost + 1)
-        
-        best_index = np.argmax(reward)
-        
-        best_settings = search_df.iloc[best_index]
-        
-        return {
-            'inlet': int(best_settings['inlet_temp_c']),
-            'workload': int(best_settings['server_workload_percent']),
-            'reward_score': reward[best_index]
-        }
+        if mode is not None or budget is not None:
+            print(f"ML OPTIMIZER: Searching for '{profile}' settings at {current_ambient_temp:.1f}°C ambient...")
+            return self._search_settings(current_ambient_temp, profile, mode, budget)
+
+        key = self.suggestion_cache.key(profile, current_ambient_temp, self.model_version)
+        suggestion = self.suggestion_cache.get(key)
+        if suggestion is None:
+            print(f"ML OPTIMIZER: Searching for '{profile}' settings at {key[1]:.1f}°C ambient...")
+            suggestion = self._search_settings(key[1], profile)
+            if suggestion is not None and key[2] == self.model_version:
+                self.suggestion_cache.put(key, suggestion)
+        return suggestion
+
+    def _search_settings(self, ambient, profile, mode=None, budget=None):
+        if self.optimizer_backend == "physics" and mode is None and budget is None:
+            return solve_physics_settings(ambient, profile, self.optimizer.inlet_range, self.optimizer.workload_range)
+        return self.optimizer.search(ambient, mode=mode, budget=budget, objective=self._objective_for(profile))
+
+    def _objective_for(self, profile):
+        if self.optimizer_backend == "physics":
+            return partial(physics_objective, profile)
+        return partial(self._optimizer_objective, profile)
+
+    def precompute_suggestions(self, ambient_range=(10, 45), profiles=PROFILES):
+        """
+        Fills the suggestion cache for every quantized ambient in the range on
+        a background thread (e.g. at startup). Stops early if the models are
+        reloaded meanwhile.
+        """
+        if not self.optimizer_ready:
+            return None
+        if self._precompute_thread is not None and self._precompute_thread.is_alive():
+            return self._precompute_thread
+
+        step = self.suggestion_cache.ambient_step
+        ambients = np.arange(ambient_range[0], ambient_range[1] + step / 2, step)
+        self.suggestion_cache.max_entries = max(self.suggestion_cache.max_entries, len(ambients) * len(profiles) * 2)
+        version = self.model_version
+
+        def run():
+            for ambient in ambients:
+                for profile in profiles:
+                    if self.model_version != version:
+                        return
+                    key = self.suggestion_cache.key(profile, ambient, version)
+                    if self.suggestion_cache.get(key) is None:
+                        suggestion = self._search_settings(key[1], profile)
+                        if suggestion is not None and self.model_version == version:
+                            self.suggestion_cache.put(key, suggestion)
+            print(f"ML OPTIMIZER: Precomputed {len(self.suggestion_cache)} suggestions.")
+
+        self._precompute_thread = threading.Thread(target=run, name="SuggestionPrecompute", daemon=True)
+        self._precompute_thread.start()
+        return self._precompute_thread
+
+    def _optimizer_objective(self, profile, ambient, inlets, workloads, fidelity=1.0):
+        """Reward of each candidate setting, predicted by the cost and compute models."""
+        search_df = pd.DataFrame({
+            'ambient_temp_c': np.full(len(inlets), ambient, dtype=float),
+            'inlet_temp_c': inlets.astype(float),
+            'server_workload_percent': workloads.astype(float)
+        })[self.optimizer_features]
+
+        pred_cost = self._predict_forest(self.cost_model, search_df, fidelity)
+        pred_compute = self._predict_forest(self.compute_model, search_df, fidelity)
+        return profile_reward(profile, pred_cost, pred_compute)
+
+    @staticmethod
+    def _predict_forest(model, X, fidelity):
+        """Full prediction, or the mean of the first share of trees for a cheap, rough one."""
+        if isinstance(model, CompactForest):
+            n_trees = None if fidelity >= 1.0 else max(1, int(round(model.n_trees * fidelity)))
+            return model.predict(X, n_trees)
+        trees = getattr(model, 'estimators_', None)
+        if fidelity >= 1.0 or not trees:
+            return model.predict(X)
+        n_trees = max(1, int(round(len(trees) * fidelity)))
+        values = X.to_numpy(dtype=np.float32)
+        return np.mean([tree.predict(values) for tree in trees[:n_trees]], axis=0)
 
     # --- 'add_to_buffer' and 'calibrate' are REMOVED ---
     
     # --- ADDED this NEW 'update_and_refit' method ---
     def update_and_refit(self, data_dict):
         """
-        Adds a new data point and refits all ML models.
+        Adds a new data point and updates all ML models.
         This is called on every simulation step.
         """
         self.history_buffer.append(data_dict)
         
+        # Streaming models are updated incrementally (O(1) per tick)
+        if self.anomaly_mode == "streaming":
+            sample = [self._feature_value(data_dict, feature) for feature in self.anomaly_features]
+            self.last_anomaly_score = self.anomaly_detector.update(sample)[0]
+        for feature, forecaster in self.forecasters.items():
+            forecaster.update(self._feature_value(data_dict, feature))
+        self._apply_snapshot()
+        
         # We need *some* data to train, > 20 steps is a safe minimum to avoid errors
         if len(self.history_buffer) < 20:
             print(f"ML: Collecting initial data... {len(self.history_buffer)}/20")
@@ -121,27 +266,56 @@ class MLEngine:
         if len(self.history_buffer) == 20:
             print("ML: Initial data collected. Live training starting.")
 
-        df = pd.DataFrame(self.history_buffer)
+        # 1. Schedule a forest retrain in the background (forest mode, fixed cadence)
+        if self.anomaly_mode == "forest":
+            self._ticks_since_forest_fit += 1
+            if self._ticks_since_forest_fit >= self.forest_retrain_interval or self.anomaly_detector is None:
+                self._schedule_forest_fit()
+
+        # 2. Schedule a full forecast refit in the background (fixed cadence)
+        self._ticks_since_refit += 1
+        if self._ticks_since_refit >= self.forecast_refit_interval or len(self.history_buffer) == 20:
+            self._schedule_forecast_refit()
+
+    @staticmethod
+    def _feature_value(data_dict, feature):
+        if feature == 'total_power':
+            return data_dict['total_server_power_kw'] + data_dict['total_cooling_power_kw']
+        return data_dict[feature]
+
+    def _schedule_forecast_refit(self):
+        """Hands a snapshot of the history to the worker for a full ARIMA(1,0,0) refit."""
+        if self.worker.is_busy("forecast"):
+            return # Previous refit still running; try again next tick
+        series = {
+            feature: [self._feature_value(d, feature) for d in self.history_buffer]
+            for feature in self.forecast_features
+        }
+        if self.worker.submit_forecast_refit(series):
+            self._ticks_since_refit = 0
+
+    def _schedule_forest_fit(self):
+        """Hands a snapshot of the history to the worker to train a fresh IsolationForest."""
+        if self.worker.is_busy("anomaly"):
+            return
+        df = pd.DataFrame(list(self.history_buffer))
         df['total_power'] = df['total_server_power_kw'] + df['total_cooling_power_kw']
+        if self.worker.submit_anomaly_fit(df[self.anomaly_features]):
+            self._ticks_since_forest_fit = 0
 
-        # 1. Re-Train Anomaly Detection Model
-        try:
-            anomaly_data = df[self.anomaly_features]
-            self.anomaly_detector.fit(anomaly_data)
-        except Exception as e:
-            print(f"ML Error (Anomaly): {e}")
+    def _apply_snapshot(self):
+        """Picks up whatever the worker finished since the last tick (never waits)."""
+        snapshot = self.worker.snapshot
+        if snapshot.forecast_version != self._forecast_version:
+            self._forecast_version = snapshot.forecast_version
+            for feature, (mean, phi) in snapshot.forecast_params.items():
+                self.forecasters[feature].reseed(mean, phi)
+        if self.anomaly_mode == "forest" and snapshot.anomaly_model is not None:
+            self.anomaly_detector = snapshot.anomaly_model
 
-        # 2. Re-Train Forecasting Models
-        try:
-            for feature in self.forecast_features:
-                # (Re-training ARIMA every step is slow, but works for this demo)
-                model = ARIMA(df[feature], order=(1, 0, 0)) 
-                model_fit = model.fit()
-                self.forecasters[feature] = model_fit
-        except Exception as e:
-            # This can fail if data is all the same (e.g., in override)
-            # print(f"ML Error (Forecast): {e}")
-            pass # Suppress repeat warnings
+    def shutdown(self):
+        """Stops the background worker."""
+        self.worker.shutdown()
 
     def infer_anomaly(self, current_data_df):
         """
@@ -151,6 +325,9 @@ class MLEngine:
             return 0 
             
         try:
+            if self.anomaly_mode == "streaming":
+                # The latest sample was already scored (before being learned) in update_and_refit
+                return -1 if self.anomaly_detector.is_anomaly(self.last_anomaly_score) else 1
             prediction = self.anomaly_detector.predict(current_data_df)
             return prediction[0]
         except Exception as e:
@@ -161,17 +338,13 @@ class MLEngine:
         """
         Generates a forecast for all relevant features.
         """
-        if not self.ml_ready or not self.forecasters or len(self.history_buffer) < 20:
+        if not self.ml_ready or len(self.history_buffer) < 20:
             return {}
             
         forecast_results = {}
         try:
             for feature, model in self.forecasters.items():
-                history_len = model.nobs
-                start = history_len
-                end = history_len + self.forecast_steps - 1
-                
-                forecast = list(model.predict(start, end))
+                forecast = model.forecast(self.forecast_steps)
                 clean_key = feature.replace('total_power', 'power') \
                                    .replace('average_pue', 'pue') \
                                    .replace('max_outlet_temp_c', 'temp') \
@@ -182,4 +355,4 @@ class MLEngine:
             # print(f"Forecasting error: {e}")
             return {}
             
-        return forecast_results
\ No newline at end of file
+        return forecast_results
@@ -1,18 +1,127 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-class MLCalibrationWorker(QObject):
+from sklearn.ensemble import IsolationForest
+
+from ml.forecasting import fit_arima_params
+
+class MLSnapshot:
+    """
+    Immutable set of the latest trained models, as published by MLWorker.
+
+    forecast_params maps a feature to its (mean, phi) ARIMA fit and
+    anomaly_model is the latest IsolationForest (None until one is trained).
+    The *_version counters tell readers which parts changed since the last
+    snapshot they saw.
     """
-    A PyQt-compatible worker that runs the ML calibration in a separate thread.
+    __slots__ = ("version", "forecast_version", "forecast_params", "anomaly_version", "anomaly_model", "created_at")
+
+    def __init__(self, version=0, forecast_version=0, forecast_params=None, anomaly_version=0, anomaly_model=None):
+        self.version = version
+        self.forecast_version = forecast_version
+        self.forecast_params = dict(forecast_params or {})
+        self.anomaly_version = anomaly_version
+        self.anomaly_model = anomaly_model
+        self.created_at = time.time()
+
+    def replace(self, forecast_params=None, anomaly_model=None):
+        """Returns the next snapshot with the given parts swapped in."""
+        return MLSnapshot(
+            version=self.version + 1,
+            forecast_version=self.forecast_version + (forecast_params is not None),
+            forecast_params=self.forecast_params if forecast_params is None else forecast_params,
+            anomaly_version=self.anomaly_version + (anomaly_model is not None),
+            anomaly_model=self.anomaly_model if anomaly_model is None else anomaly_model,
+        )
+
+
+def fit_forecast_params(series):
+    """Full ARIMA(1,0,0) fit of every feature series. Returns {feature: (mean, phi)}."""
+    params = {}
+    for feature, values in series.items():
+        try:
+            params[feature] = fit_arima_params(values)
+        except Exception:
+            # This can fail if data is all the same (e.g., in override)
+            pass
+    return params
+
+def fit_anomaly_forest(anomaly_data):
+    return IsolationForest(contamination=0.05, random_state=42).fit(anomaly_data)
+
+
+class MLWorker:
     """
-    finished = pyqtSignal() # Signal to emit when calibration is done
-
-    def __init__(self, ml_engine):
-        super().__init__()
-        self.ml_engine = ml_engine
-
-    def run(self):
-        """
-        This method is executed in the new thread.
-        """
-        self.ml_engine.calibrate()
-        self.finished.emit()
\ No newline at end of file
+    Runs model refits on a thread or process pool and publishes the results.
+
+    Jobs are submitted without blocking; at most one job of each kind is in
+    flight (further requests are dropped until it finishes). Each finished
+    job atomically swaps in a new MLSnapshot, so readers always get the most
+    recent completed models from `snapshot` and never wait on training.
+    """
+    POOLS = ("thread", "process")
+
+    def __init__(self, pool="thread", max_workers=1):
+        if pool not in self.POOLS:
+            raise ValueError(f"Unknown pool '{pool}', expected one of {self.POOLS}")
+        if pool == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="MLWorker")
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.pool = pool
+        self._snapshot = MLSnapshot()
+        self._publish_lock = threading.Lock()
+        self._in_flight = set()
+        self.failed_jobs = 0
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def is_busy(self, kind):
+        return kind in self._in_flight
+
+    def submit_forecast_refit(self, series):
+        """series: {feature: list of values}. Returns False if a refit is already running."""
+        return self._submit("forecast", fit_forecast_params, series)
+
+    def submit_anomaly_fit(self, anomaly_data):
+        """anomaly_data: feature DataFrame. Returns False if a fit is already running."""
+        return self._submit("anomaly", fit_anomaly_forest, anomaly_data)
+
+    def _submit(self, kind, fn, data):
+        with self._publish_lock:
+            if kind in self._in_flight:
+                return False
+            self._in_flight.add(kind)
+        try:
+            future = self._executor.submit(fn, data)
+        except RuntimeError:
+            # Executor already shut down
+            self._in_flight.discard(kind)
+            return False
+        future.add_done_callback(lambda f: self._on_done(kind, f))
+        return True
+
+    def _on_done(self, kind, future):
+        if future.cancelled():
+            self._in_flight.discard(kind)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"MLWorker: {kind} fit failed: {e}")
+            self.failed_jobs += 1
+            result = None
+        with self._publish_lock:
+            if result is not None:
+                if kind == "forecast":
+                    self._snapshot = self._snapshot.replace(forecast_params=result)
+                else:
+                    self._snapshot = self._snapshot.replace(anomaly_model=result)
+            self._in_flight.discard(kind)
+
+    def shutdown(self, wait=False):
+        # Worker processes must be joined before the interpreter exits
+        self._executor.shutdown(wait=wait or self.pool == "process", cancel_futures=True)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from ml.rack_models import CRITICAL_TEMP_C, WARNING_TEMP_C
+from twin.digital_twin_engine import DataCenterTwin
+
+class FleetAggregator:
+    """
+    Computes every fleet-wide KPI of a tick from the per-rack result arrays.
+
+    One call replaces the separate Python passes the controller and the
+    dashboard used to make (sums, max/argmax, means, threshold counts):
+    each statistic is a single NumPy reduction over the rack arrays, and the
+    threshold bands are counted in one bucketing pass.
+    The returned dict holds plain Python numbers, ready for the UI.
+    """
+    def __init__(self):
+        twin = DataCenterTwin()
+        self.cost_per_kwh_usd = twin.COST_PER_KWH_USD
+        self.strategy_labels = DataCenterTwin.STRATEGY_LABELS
+        self.band_edges = np.array([WARNING_TEMP_C, CRITICAL_TEMP_C])
+
+    def aggregate(self, results):
+        """
+        results: dict of per-rack arrays as returned by compute_batch.
+        Returns the fleet KPIs (the keys of aggregated_results plus the
+        thermal statistics), or an empty dict for an empty fleet.
+        """
+        outlet_temps = results['outlet_temp_c']
+        if len(outlet_temps) == 0:
+            return {}
+
+        total_server_power_w = float(results['calculated_server_power_watts'].sum())
+        total_cooling_power_w = float(results['cooling_unit_power_watts'].sum())
+        total_facility_power_w = total_server_power_w + total_cooling_power_w
+        avg_pue = total_facility_power_w / total_server_power_w if total_server_power_w > 0 else 0
+
+        hottest = int(outlet_temps.argmax())
+        coldest = int(outlet_temps.argmin())
+        # The strategy of the rack furthest above target sets the fleet strategy
+        most_deviating = int(results['temp_deviation_c'].argmax())
+
+        # Threshold bands: 0 = normal, 1 = warning (WARNING <= t < CRITICAL), 2 = critical (t >= CRITICAL)
+        band_counts = np.bincount(np.searchsorted(self.band_edges, outlet_temps, side='right'), minlength=3)
+
+        return {
+            "total_server_power_kw": total_server_power_w / 1000,
+            "total_cooling_power_kw": total_cooling_power_w / 1000,
+            "average_pue": avg_pue,
+            "max_outlet_temp_c": float(outlet_temps[hottest]),
+            "min_outlet_temp_c": float(outlet_temps[coldest]),
+            "avg_outlet_temp_c": float(outlet_temps.mean()),
+            "hottest_rack": hottest,
+            "coldest_rack": coldest,
+            "total_daily_cost_usd": total_facility_power_w / 1000 * self.cost_per_kwh_usd * 24,
+            "cooling_strategy": self.strategy_labels[results['cooling_strategy'][most_deviating]],
+            "total_compute_output": float(results['compute_output'].sum()),
+            "racks_warning": int(band_counts[1]),
+            "racks_critical": int(band_counts[2]),
+        }
@@ -2,6 +2,8 @@ import random
 import math
 from datetime import datetime
 
+import numpy as np
+
 class StateRandomizer:
     """
     Applies a layer of dynamic, "natural" variation on top of a baseline
@@ -17,10 +19,9 @@ class StateRandomizer:
         multiplier_range = peak_multiplier - trough_multiplier
         return trough_multiplier + (1 + sine_wave) / 2 * multiplier_range
 
-    def apply_natural_variation(self, baseline_payloads):
+    def apply_natural_variation(self, state):
         """
-        Takes a list of baseline payloads and returns a new list with
-        dynamic variations applied.
+        Applies dynamic variations to a RackStateArray in place and returns it.
         """
         # Get the global multipliers for the current simulated hour
         workload_multiplier = self._get_diurnal_multiplier(self.simulation_hour, 1.2, 0.7) # 20% higher in day, 30% lower at night
@@ -29,29 +30,88 @@ class StateRandomizer:
         if 12 <= self.simulation_hour <= 13: # Lunchtime dip
             workload_multiplier *= 0.8 
 
-        varied_payloads = []
-        for payload in baseline_payloads:
-            new_payload = payload.copy()
-
+        workloads = state.workload
+        ambients = state.ambient
+        for i in range(len(state)):
             # Apply multiplier and random noise to the baseline workload
-            base_workload = new_payload['server_workload_percent']
-            varied_workload = base_workload * workload_multiplier + random.uniform(-5, 5)
+            varied_workload = workloads[i] * workload_multiplier + random.uniform(-5, 5)
             
             # Add occasional random spikes for realism
             if random.random() < 0.02:
                 varied_workload += random.uniform(15, 30)
 
             # Apply multiplier and noise to ambient temperature
-            base_ambient = new_payload['ambient_temp_c']
-            varied_ambient = base_ambient * ambient_multiplier + random.uniform(-1, 1)
+            varied_ambient = ambients[i] * ambient_multiplier + random.uniform(-1, 1)
 
-            new_payload['server_workload_percent'] = max(5, min(100, varied_workload))
-            new_payload['ambient_temp_c'] = varied_ambient
-            
-            varied_payloads.append(new_payload)
+            workloads[i] = max(5, min(100, varied_workload))
+            ambients[i] = varied_ambient
 
         # Advance the simulation time for the next cycle
         self.simulation_hour = (self.simulation_hour + 1) % 24
         
-        return varied_payloads
+        return state
+
+
+class VectorizedStateRandomizer(StateRandomizer):
+    """
+    NumPy-backed StateRandomizer. Applies the diurnal multipliers, noise, spikes
+    and clamps to the whole RackStateArray in one pass, drawing from an explicit
+    numpy Generator so that a run can be replayed exactly from its seed.
+    """
+    SPIKE_PROBABILITY = 0.02
+
+    def __init__(self, seed=None, start_hour=None):
+        if isinstance(seed, np.random.Generator):
+            self.rng = seed
+        else:
+            self.rng = np.random.default_rng(seed)
+        self.simulation_hour = datetime.now().hour if start_hour is None else start_hour % 24
+        self._scratch = None
+        print(f"VectorizedStateRandomizer initialized. Starting at hour: {self.simulation_hour}.")
+
+    def _scratch_buffers(self, size):
+        """Per-size scratch arrays, so a tick does not allocate new noise buffers."""
+        if self._scratch is None or self._scratch[0].shape[0] != size:
+            self._scratch = tuple(np.empty(size, dtype=np.float64) for _ in range(4))
+        return self._scratch
+
+    def apply_natural_variation(self, state):
+        """
+        Applies dynamic variations to a RackStateArray in place and returns it.
+        """
+        workload_multiplier = self._get_diurnal_multiplier(self.simulation_hour, 1.2, 0.7)
+        ambient_multiplier = self._get_diurnal_multiplier(self.simulation_hour, 1.1, 0.9)
+
+        if 12 <= self.simulation_hour <= 13: # Lunchtime dip
+            workload_multiplier *= 0.8
+
+        workload_noise, spike_draw, spike_size, ambient_noise = self._scratch_buffers(len(state))
+        self.rng.random(out=workload_noise)
+        self.rng.random(out=spike_draw)
+        self.rng.random(out=spike_size)
+        self.rng.random(out=ambient_noise)
+
+        # Workload: multiplier + uniform(-5, 5) noise + uniform(15, 30) spikes on ~2% of racks
+        workload_noise *= 10
+        workload_noise -= 5
+        spike_size *= 15
+        spike_size += 15
+        spike_size *= spike_draw < self.SPIKE_PROBABILITY
+
+        workloads = state.workload
+        workloads *= workload_multiplier
+        workloads += workload_noise
+        workloads += spike_size
+        np.clip(workloads, 5, 100, out=workloads)
+
+        # Ambient: multiplier + uniform(-1, 1) noise
+        ambient_noise *= 2
+        ambient_noise -= 1
+        ambients = state.ambient
+        ambients *= ambient_multiplier
+        ambients += ambient_noise
+
+        # Advance the simulation time for the next cycle
+        self.simulation_hour = (self.simulation_hour + 1) % 24
 
+        return state
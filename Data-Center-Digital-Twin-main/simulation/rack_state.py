@@ -0,0 +1,56 @@
+import numpy as np
+
+class RackStateArray:
+    """
+    Columnar store for the per-rack simulation inputs.
+
+    Workload, inlet and ambient values live in one contiguous float array each,
+    indexed by rack. The arrays are allocated once and then filled in place
+    every tick, so the simulation no longer builds and copies a payload dict
+    per rack.
+    """
+    FIELDS = ("server_workload_percent", "inlet_temp_c", "ambient_temp_c")
+
+    def __init__(self, entity_ids):
+        self.entity_ids = list(entity_ids)
+        size = len(self.entity_ids)
+        self.workload = np.zeros(size, dtype=np.float64)
+        self.inlet = np.zeros(size, dtype=np.float64)
+        self.ambient = np.zeros(size, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.entity_ids)
+
+    def __getitem__(self, field):
+        """Column access by payload field name, e.g. state['inlet_temp_c']."""
+        if field == "server_workload_percent":
+            return self.workload
+        if field == "inlet_temp_c":
+            return self.inlet
+        if field == "ambient_temp_c":
+            return self.ambient
+        raise KeyError(field)
+
+    @classmethod
+    def from_payloads(cls, entity_ids, payloads):
+        """Builds a state from a list of payload dicts (one per entity id)."""
+        state = cls(entity_ids)
+        for i, payload in enumerate(payloads):
+            state.workload[i] = payload['server_workload_percent']
+            state.inlet[i] = payload['inlet_temp_c']
+            state.ambient[i] = payload['ambient_temp_c']
+        return state
+
+    def copy_from(self, other):
+        """Overwrites this state's values with another state of the same size."""
+        np.copyto(self.workload, other.workload)
+        np.copyto(self.inlet, other.inlet)
+        np.copyto(self.ambient, other.ambient)
+        return self
+
+    def to_payloads(self):
+        """Returns the state as a list of payload dicts (for export/debugging only)."""
+        return [
+            {"server_workload_percent": w, "inlet_temp_c": i, "ambient_temp_c": a}
+            for w, i, a in zip(self.workload.tolist(), self.inlet.tolist(), self.ambient.tolist())
+        ]
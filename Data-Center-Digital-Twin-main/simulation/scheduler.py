@@ -0,0 +1,81 @@
+import threading
+import time
+
+class TickScheduler:
+    """
+    Runs a tick function at a fixed rate on its own thread.
+
+    Ticks are scheduled against a monotonic clock, so a slow tick does not
+    stretch the interval of the following ones. A tick that runs past its
+    next deadline counts as an overrun; deadlines that were missed entirely
+    are skipped (not bunched up) and counted in skipped_ticks. An interval of
+    0 runs ticks back to back.
+    """
+
+    def __init__(self, tick_fn, interval_s, name="TickScheduler"):
+        self.tick_fn = tick_fn
+        self.interval_s = interval_s
+        self.name = name
+
+        # --- Overrun accounting ---
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_tick_duration = 0.0
+        self.max_tick_duration = 0.0
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def trigger(self):
+        """Runs a tick as soon as possible; the fixed cadence restarts from that tick."""
+        self._wake.set()
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "last_tick_duration": self.last_tick_duration,
+            "max_tick_duration": self.max_tick_duration,
+        }
+
+    def _run(self):
+        next_deadline = time.monotonic()
+        while not self._stop.is_set():
+            triggered = self._wake.wait(max(0.0, next_deadline - time.monotonic()))
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+
+            started = time.monotonic()
+            try:
+                self.tick_fn()
+            except Exception as e:
+                print(f"{self.name}: tick failed: {e}")
+            finished = time.monotonic()
+
+            self.ticks += 1
+            self.last_tick_duration = finished - started
+            self.max_tick_duration = max(self.max_tick_duration, self.last_tick_duration)
+
+            next_deadline = (started if triggered else next_deadline) + self.interval_s
+            if self.interval_s > 0 and finished > next_deadline:
+                self.overruns += 1
+                missed = int((finished - next_deadline) // self.interval_s) + 1
+                self.skipped_ticks += missed - 1
+                next_deadline += (missed - 1) * self.interval_s
@@ -0,0 +1,227 @@
+import sys
+import time
+import argparse
+import threading
+import warnings
+
+# --- ML/Data Imports ---
+import numpy as np
+import pandas as pd
+warnings.filterwarnings("ignore")
+
+# --- Import from our project files ---
+from data_pipeline import ScenarioCombinator, DataIngestor
+from twin.digital_twin_engine import compute_batch
+from simulation.dynamics import VectorizedStateRandomizer
+from simulation.rack_state import RackStateArray
+from simulation.scheduler import TickScheduler
+from simulation.aggregation import FleetAggregator
+from ml_engine import MLEngine
+from ml.rack_models import RackModelBank
+from db.telemetry_recorder import TelemetryRecorder
+
+class SimulationEngine:
+    """
+    Headless simulation loop: scenario plan, randomization, physics, aggregation
+    and ML inference, run at a fixed tick rate on its own thread.
+
+    Each tick is published as a plain dict to every subscriber (the Qt window,
+    the Unity bridge, the history recorder, ...). Subscribers are called on the
+    simulation thread, so GUI consumers must marshal the tick to their own
+    thread. The per-rack arrays in a tick are never reused by the engine.
+    """
+    DEFAULT_INTERVAL_S = 1.5
+
+    def __init__(self, seed=None, start_hour=None, interval_s=DEFAULT_INTERVAL_S, record_history=True,
+                 optimizer_backend="surrogate"):
+        print("Initializing components...")
+        # Independent, seeded RNG streams so a whole run can be replayed from its seed
+        seed_sequence = np.random.SeedSequence(seed)
+        print(f"Simulation seed: {seed_sequence.entropy}")
+        plan_seed, variation_seed = seed_sequence.spawn(2)
+        self.ingestor = DataIngestor()
+        self.combinator = ScenarioCombinator(num_machines=len(self.ingestor.machine_ids),
+                                             rng=np.random.default_rng(plan_seed))
+        self.randomizer = VectorizedStateRandomizer(variation_seed, start_hour=start_hour)
+        self.rack_state = RackStateArray(self.ingestor.machine_ids) # Reused every tick
+        self.current_ambient_temp = 25.0
+
+        # --- ML State Attributes ---
+        self.simulation_step = 0
+        forecast_features = ['average_pue', 'max_outlet_temp_c', 'total_power', 'total_daily_cost_usd']
+        anomaly_features = ['average_pue', 'max_outlet_temp_c', 'total_power', 'total_compute_output']
+
+        self.ml_engine = MLEngine(forecast_features, anomaly_features, optimizer_backend=optimizer_backend)
+        self.ml_engine.precompute_suggestions() # Background; makes optimizer suggestions instant
+        # Per-rack baselines, z-scores and forecasts (vectorized over the fleet)
+        self.rack_models = RackModelBank(len(self.rack_state))
+        self.aggregator = FleetAggregator()
+
+        # --- Overrides: (workload, inlet, ambient), None = not overridden ---
+        self._overrides = (None, None, None)
+        self._overrides_lock = threading.Lock()
+
+        self._subscribers = []
+        self.scheduler = TickScheduler(self.step, interval_s, name="SimulationEngine")
+
+        # --- Write-behind history recorder (background thread) ---
+        self.recorder = None
+        if record_history:
+            self.recorder = TelemetryRecorder()
+            self.subscribe(self.recorder.on_tick)
+
+    # --- Control API (safe to call from any thread) ---
+
+    def subscribe(self, callback):
+        """Registers callback(tick) to receive every published tick."""
+        self._subscribers.append(callback)
+
+    def set_overrides(self, workload=None, inlet=None, ambient=None):
+        """Sets the what-if overrides applied from the next tick on. None clears one."""
+        with self._overrides_lock:
+            self._overrides = (workload, inlet, ambient)
+
+    def request_tick(self):
+        """Asks for an immediate tick, e.g. after the user changed an override."""
+        self.scheduler.trigger()
+
+    def start(self):
+        self.scheduler.start()
+        print("Continuous simulation started.")
+
+    def stop(self):
+        self.scheduler.stop()
+        self.ml_engine.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    # --- Main Simulation Loop ---
+
+    def step(self):
+        """Runs one tick and publishes it. Returns the tick dict (None if there are no racks)."""
+        self.simulation_step += 1
+
+        plan = self.combinator.generate_random_combination_plan()
+        state = self.ingestor.get_state_from_plan(plan, out=self.rack_state)
+        self.randomizer.apply_natural_variation(state)
+        if len(state) == 0: return None
+
+        with self._overrides_lock:
+            override_workload, override_inlet, override_ambient = self._overrides
+        overrides_active = any(value is not None for value in (override_workload, override_inlet, override_ambient))
+
+        if override_ambient is not None:
+            self.current_ambient_temp = override_ambient
+        else:
+            self.current_ambient_temp = float(state.ambient.mean())
+
+        # Overrides are written straight into the state arrays
+        if override_workload is not None:
+            np.clip(override_workload + self.randomizer.rng.uniform(-2, 2, len(state)), 0, 100, out=state.workload)
+        if override_inlet is not None: state.inlet.fill(override_inlet)
+        if override_ambient is not None: state.ambient.fill(override_ambient)
+
+        results = compute_batch(state)
+        outlet_temps = results['outlet_temp_c']
+        fleet_stats = self.aggregator.aggregate(results)
+
+        rack_status = self.rack_models.update(outlet_temps).copy()
+        rack_flagged = self.rack_models.flagged.copy()
+
+        aggregated_results = {
+            **fleet_stats,
+            "individual_outlet_temps": outlet_temps.tolist(),
+            "individual_workloads": state.workload.tolist(),
+            "individual_rack_status": rack_status.tolist(),
+            "flagged_racks": np.flatnonzero(rack_flagged).tolist(),
+        }
+
+        # --- ML LOGIC ---
+        # 1. Update models with the latest data
+        self.ml_engine.update_and_refit(aggregated_results)
+
+        # 2. Prepare data for inference
+        current_features_df = pd.DataFrame([{
+            'average_pue': aggregated_results['average_pue'],
+            'max_outlet_temp_c': aggregated_results['max_outlet_temp_c'],
+            'total_power': aggregated_results['total_server_power_kw'] + aggregated_results['total_cooling_power_kw'],
+            'total_compute_output': aggregated_results['total_compute_output']
+        }])[self.ml_engine.anomaly_features]
+
+        # 3. Run Anomaly Inference
+        prediction = self.ml_engine.infer_anomaly(current_features_df)
+
+        # 4. Run Forecast Inference
+        forecast_results = self.ml_engine.infer_forecasts()
+
+        tick = {
+            "step": self.simulation_step,
+            "timestamp": time.time(),
+            "aggregated_results": aggregated_results,
+            "forecast_results": forecast_results,
+            "anomaly": bool(prediction == -1),
+            "overrides_active": overrides_active,
+            "current_ambient_temp": self.current_ambient_temp,
+            "entity_ids": state.entity_ids,
+            "workloads": state.workload.copy(),
+            "inlets": state.inlet.copy(),
+            "ambients": state.ambient.copy(),
+            "outlet_temps": outlet_temps,
+            "server_powers": results['calculated_server_power_watts'],
+            "rack_status": rack_status,
+            "rack_flagged": rack_flagged,
+            "rack_zscores": self.rack_models.zscores.copy(),
+            "rack_forecast": self.rack_models.forecast[:, -1].copy(),
+        }
+        self._publish(tick)
+        return tick
+
+    def _publish(self, tick):
+        for callback in list(self._subscribers):
+            try:
+                callback(tick)
+            except Exception as e:
+                print(f"SimulationEngine: subscriber {callback} failed: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the datacenter simulation headless (no Qt window).")
+    parser.add_argument("--ticks", type=int, default=0, help="Stop after this many ticks (0 = run until Ctrl+C).")
+    parser.add_argument("--interval", type=float, default=SimulationEngine.DEFAULT_INTERVAL_S,
+                        help="Seconds between ticks (0 = as fast as possible).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible run.")
+    parser.add_argument("--start-hour", type=int, default=None, help="Simulated hour of day to start at.")
+    parser.add_argument("--unity", action="store_true", help="Also serve ticks to Unity over WebSocket.")
+    parser.add_argument("--no-record", action="store_true", help="Do not persist ticks to the telemetry DB.")
+    parser.add_argument("--optimizer", choices=MLEngine.OPTIMIZER_BACKENDS, default="surrogate",
+                        help="Evaluate optimizer suggestions with the trained models or the physics directly.")
+    args = parser.parse_args(argv)
+
+    engine = SimulationEngine(seed=args.seed, start_hour=args.start_hour, interval_s=args.interval,
+                              record_history=not args.no_record, optimizer_backend=args.optimizer)
+    if args.unity:
+        from unity_bridge import UnityBridge
+        engine.subscribe(UnityBridge().send_tick)
+
+    done = threading.Event()
+    def on_tick(tick):
+        results = tick["aggregated_results"]
+        print(f"Tick {tick['step']}: PUE {results['average_pue']:.2f}, "
+              f"max outlet {results['max_outlet_temp_c']:.1f}°C, "
+              f"power {results['total_server_power_kw'] + results['total_cooling_power_kw']:.0f} kW")
+        if args.ticks and tick["step"] >= args.ticks:
+            done.set()
+    engine.subscribe(on_tick)
+
+    engine.start()
+    try:
+        while not done.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+        print(f"Scheduler stats: {engine.scheduler.stats()}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules are imported from the project root (python simulation_engine.py, python -m ingest.load_json ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
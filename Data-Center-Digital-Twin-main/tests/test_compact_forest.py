@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from ml.compact_forest import CompactForest
+
+FEATURES = ["ambient_temp_c", "inlet_temp_c", "server_workload_percent"]
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "ambient_temp_c": rng.uniform(10, 45, 600),
+        "inlet_temp_c": rng.integers(15, 31, 600).astype(float),
+        "server_workload_percent": rng.integers(20, 101, 600).astype(float),
+    })
+    y = X["server_workload_percent"] * 3 - (X["inlet_temp_c"] - 24) ** 2 + rng.normal(0, 2, 600)
+    model = RandomForestRegressor(n_estimators=25, max_depth=12, random_state=0).fit(X, y)
+    rng = np.random.default_rng(1)
+    X_test = pd.DataFrame({
+        "ambient_temp_c": rng.uniform(5, 50, 400),
+        "inlet_temp_c": rng.uniform(14, 32, 400),
+        "server_workload_percent": rng.uniform(15, 105, 400),
+    })
+    # Samples exactly on split thresholds exercise the float32 comparison
+    X_test = pd.concat([X_test, X.iloc[:100]], ignore_index=True)
+    return model, X_test
+
+def test_predictions_match_sklearn(fitted):
+    model, X_test = fitted
+    forest = CompactForest.from_sklearn(model)
+    assert forest.feature_names == FEATURES
+    np.testing.assert_allclose(forest.predict(X_test), model.predict(X_test), rtol=1e-12)
+
+def test_tree_subset_matches_the_first_estimators(fitted):
+    model, X_test = fitted
+    forest = CompactForest.from_sklearn(model)
+    values = X_test.to_numpy(dtype=np.float32)
+    expected = np.mean([tree.predict(values) for tree in model.estimators_[:7]], axis=0)
+    np.testing.assert_allclose(forest.predict(X_test, n_trees=7), expected, rtol=1e-12)
+
+def test_save_and_memory_mapped_load_round_trip(fitted, tmp_path):
+    model, X_test = fitted
+    CompactForest.from_sklearn(model).save(str(tmp_path))
+    assert CompactForest.exists(str(tmp_path))
+    loaded = CompactForest.load(str(tmp_path))
+    assert isinstance(loaded.value, np.memmap)
+    # Columns in another order are picked by name
+    np.testing.assert_allclose(loaded.predict(X_test[FEATURES[::-1]]), model.predict(X_test), rtol=1e-12)
@@ -0,0 +1,72 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from ml.optimizer import PROFILES, SettingsOptimizer, physics_objective, solve_physics_settings
+
+AMBIENTS = np.arange(10.0, 45.1, 2.5)
+
+def _interior_objective(ambient, inlets, workloads, fidelity=1.0):
+    """Smooth bowl with its optimum inside the domain; low fidelity adds a deterministic error."""
+    inlets, workloads = np.asarray(inlets, dtype=float), np.asarray(workloads, dtype=float)
+    reward = -((inlets - 23.3) ** 2 + ((workloads - 61.7) / 4) ** 2 + 0.01 * ambient)
+    error = np.sin(inlets * 12.9898 + workloads * 78.233) * 3.0
+    return reward + (1.0 - fidelity) * error
+
+def _brute_force(objective, ambient, inlet_range=(15, 30), workload_range=(20, 100)):
+    inlets, workloads = np.meshgrid(np.arange(inlet_range[0], inlet_range[1] + 1),
+                                    np.arange(workload_range[0], workload_range[1] + 1), indexing='ij')
+    rewards = objective(ambient, inlets.ravel(), workloads.ravel(), 1.0)
+    best = int(np.argmax(rewards))
+    return int(inlets.ravel()[best]), int(workloads.ravel()[best]), float(rewards[best])
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_grid_finds_the_brute_force_optimum(profile):
+    objective = partial(physics_objective, profile)
+    optimizer = SettingsOptimizer(objective, mode="grid")
+    for ambient in AMBIENTS:
+        result = optimizer.search(ambient)
+        inlet, workload, reward = _brute_force(objective, ambient)
+        assert (result['inlet'], result['workload']) == (inlet, workload)
+        assert result['reward_score'] == pytest.approx(reward)
+        assert result['evaluations'] == optimizer.grid_size
+
+@pytest.mark.parametrize("mode, budget", [("coarse_to_fine", 150), ("successive_halving", 500)])
+@pytest.mark.parametrize("profile", PROFILES)
+def test_cheaper_modes_reach_the_grid_optimum_within_budget(mode, budget, profile):
+    objective = partial(physics_objective, profile)
+    optimizer = SettingsOptimizer(objective)
+    for ambient in AMBIENTS:
+        grid = optimizer.search(ambient, mode="grid")
+        result = optimizer.search(ambient, mode=mode, budget=budget)
+        assert result['evaluations'] <= budget < optimizer.grid_size
+        assert result['reward_score'] == pytest.approx(grid['reward_score'])
+
+@pytest.mark.parametrize("mode, budget", [("coarse_to_fine", 150), ("successive_halving", 500)])
+def test_cheaper_modes_find_an_interior_optimum(mode, budget):
+    optimizer = SettingsOptimizer(_interior_objective)
+    grid = optimizer.search(25.0, mode="grid")
+    result = optimizer.search(25.0, mode=mode, budget=budget)
+    assert (grid['inlet'], grid['workload']) == (23, 62)
+    assert (result['inlet'], result['workload']) == (23, 62)
+    assert result['evaluations'] <= budget
+
+def test_grid_is_strided_to_fit_a_small_budget():
+    optimizer = SettingsOptimizer(_interior_objective, budget=100)
+    result = optimizer.search(25.0)
+    assert result['evaluations'] <= 100
+    assert abs(result['inlet'] - 23) <= 3 and abs(result['workload'] - 62) <= 6
+
+def test_exhausted_budget_returns_none():
+    assert SettingsOptimizer(_interior_objective).search(25.0, budget=0) is None
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_breakpoint_solve_matches_the_grid(profile):
+    optimizer = SettingsOptimizer(partial(physics_objective, profile), mode="grid")
+    for ambient in np.arange(5.0, 50.1, 0.5):
+        grid = optimizer.search(ambient)
+        solved = solve_physics_settings(ambient, profile)
+        assert (solved['inlet'], solved['workload']) == (grid['inlet'], grid['workload'])
+        assert solved['reward_score'] == pytest.approx(grid['reward_score'])
+        assert solved['evaluations'] < optimizer.grid_size
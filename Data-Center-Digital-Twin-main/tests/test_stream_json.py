@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from ingest.stream_json import iter_json_records
+
+DOCUMENT = [
+    {"meta_data": {"entityId": "rack-1", "timestamp": "2025-01-01T00:00:00Z"},
+     "payload": {"inlet_temp_c": 24.726, "ambient_temp_c": -1.5e-3, "tags": ["a,b", "]", "{"]}},
+    24.726, 1, -0.0, 1e10, 3.25E+2, 7,
+    "text with \"quotes\" and , ] }", True, False, None, [], {}, [[1, 2.5], [-3e-2]],
+    {"payload": {"server_workload_percent": None, "inlet_temp_c": 100}},
+]
+
+def _write(tmp_path, text):
+    path = tmp_path / "records.json"
+    path.write_text(text)
+    return str(path)
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_matches_json_load_at_any_chunk_size(tmp_path, chunk_size, separators):
+    path = _write(tmp_path, json.dumps(DOCUMENT, separators=separators))
+    with open(path) as f:
+        expected = json.load(f)
+    assert list(iter_json_records(path, chunk_size=chunk_size)) == expected
+
+def test_number_split_at_the_default_chunk_boundary(tmp_path):
+    chunk_size = 1 << 16
+    # The '.' of 24.726 is the last character of the first chunk
+    text = '["' + "x" * (chunk_size - len('["",24.')) + '",24.726, 1]'
+    assert text[chunk_size - 1] == "."
+    path = _write(tmp_path, text)
+    assert list(iter_json_records(path)) == json.loads(text)
+
+def test_single_top_level_object(tmp_path):
+    path = _write(tmp_path, json.dumps(DOCUMENT[0]))
+    assert list(iter_json_records(path, chunk_size=3)) == [DOCUMENT[0]]
+
+def test_truncated_array_raises(tmp_path):
+    path = _write(tmp_path, json.dumps(DOCUMENT)[:-1])
+    with pytest.raises(ValueError):
+        list(iter_json_records(path, chunk_size=7))
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from simulation.rack_state import RackStateArray
+from twin.digital_twin_engine import DataCenterTwin, compute_batch, compute_results
+
+def _payloads(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    payloads = [
+        {"server_workload_percent": w, "inlet_temp_c": i, "ambient_temp_c": a}
+        for w, i, a in zip(rng.uniform(0, 100, n).tolist(), rng.uniform(10, 40, n).tolist(),
+                           rng.uniform(5, 45, n).tolist())
+    ]
+    # Zeros fall back to the defaults like the scalar `or` does; hot racks cover full throttling
+    payloads += [
+        {"server_workload_percent": 0.0, "inlet_temp_c": 0.0, "ambient_temp_c": 0.0},
+        {"server_workload_percent": 100.0, "inlet_temp_c": 0.0, "ambient_temp_c": 30.0},
+        {"server_workload_percent": 100.0, "inlet_temp_c": 45.0, "ambient_temp_c": 45.0},
+        {"server_workload_percent": 50.0, "inlet_temp_c": 25.0, "ambient_temp_c": 20.0},
+    ]
+    return payloads
+
+def test_compute_batch_matches_compute_results():
+    payloads = _payloads()
+    state = RackStateArray.from_payloads(range(len(payloads)), payloads)
+    batch = compute_batch(state)
+    for i, payload in enumerate(payloads):
+        expected = compute_results(payload)
+        for key, value in expected.items():
+            if key == "cooling_strategy":
+                assert DataCenterTwin.STRATEGY_LABELS[batch[key][i]] == value
+            else:
+                assert batch[key][i] == pytest.approx(value, rel=1e-12, abs=1e-9), (key, payload)
+
+def test_compute_batch_accepts_separate_columns():
+    payloads = _payloads(50)
+    state = RackStateArray.from_payloads(range(len(payloads)), payloads)
+    by_state = compute_batch(state)
+    by_columns = compute_batch(state.workload, state.inlet, state.ambient)
+    for key in by_state:
+        np.testing.assert_array_equal(by_state[key], by_columns[key])
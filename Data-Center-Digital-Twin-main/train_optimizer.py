@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
 import joblib
+import argparse
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 # --- IMPORTANT: Add project root to path ---
 # This ensures we can import from 'twin'
@@ -13,65 +16,135 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 # Now we can import our core physics
-from twin.digital_twin_engine import compute_results
-
-print("Starting optimizer training script...")
-
-# 1. Generate a large synthetic dataset
-NUM_SAMPLES = 50000
-print(f"Generating {NUM_SAMPLES} data samples...")
-
-data = {
-    'ambient_temp_c': np.random.uniform(10, 45, NUM_SAMPLES),
-    'inlet_temp_c': np.random.uniform(15, 30, NUM_SAMPLES),
-    'server_workload_percent': np.random.uniform(0, 100, NUM_SAMPLES)
-}
-df = pd.DataFrame(data)
-
-# 2. Run the Digital Twin physics for each sample
-print("Running physics simulation for all samples...")
-results = []
-for _, row in df.iterrows():
-    # We pass the row as the 'payload' for the compute function
-    sim_result = compute_results(row.to_dict())
-    
-    cost_per_day = (sim_result['calculated_server_power_watts'] + sim_result['cooling_unit_power_watts']) / 1000 * 0.12 * 24
-    
-    results.append({
-        'cost_per_day': cost_per_day,
-        'compute_output': sim_result['compute_output']
+from twin.digital_twin_engine import DataCenterTwin, compute_batch
+from ml.compact_forest import CompactForest
+
+FEATURES = ['ambient_temp_c', 'inlet_temp_c', 'server_workload_percent']
+TARGETS = {'cost': 'cost_per_day', 'compute': 'compute_output'}
+
+
+class PhaseTimer:
+    """Prints and records how long each phase of the run took."""
+
+    def __init__(self):
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def __call__(self, name):
+        print(f"{name}...")
+        started = time.perf_counter()
+        yield
+        self.timings[name] = time.perf_counter() - started
+        print(f"{name}: {self.timings[name]:.2f}s")
+
+    def report(self):
+        print("\n--- Timing ---")
+        for name, seconds in self.timings.items():
+            print(f"{name:<28}{seconds:>8.2f}s")
+        print(f"{'Total (wall clock)':<28}{time.perf_counter() - self.started:>8.2f}s")
+
+
+def generate_dataset(num_samples, rng):
+    """Samples the slider domain and runs the physics on every sample in one vectorized pass."""
+    df = pd.DataFrame({
+        'ambient_temp_c': rng.uniform(10, 45, num_samples),
+        'inlet_temp_c': rng.uniform(15, 30, num_samples),
+        'server_workload_percent': rng.uniform(0, 100, num_samples)
     })
 
-results_df = pd.DataFrame(results)
-df = pd.concat([df, results_df], axis=1)
+    sim_results = compute_batch(df)
+    df['cost_per_day'] = (sim_results['calculated_server_power_watts'] + sim_results['cooling_unit_power_watts']) \
+                         / 1000 * DataCenterTwin().COST_PER_KWH_USD * 24
+    df['compute_output'] = sim_results['compute_output']
+    return df
+
+
+def fit_forest(X, y, n_estimators, max_depth, n_jobs, max_samples, seed):
+    """Returns (fitted model, seconds spent fitting)."""
+    started = time.perf_counter()
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=n_jobs,
+                                  max_depth=max_depth, max_samples=max_samples)
+    model.fit(X, y)
+    return model, time.perf_counter() - started
+
+
+def train_models(df, n_estimators=50, max_depth=10, n_jobs=-1, max_samples=None, seed=42, timer=None):
+    """
+    Fits the cost and compute forests concurrently (the cores are split
+    between the two fits). Returns {'cost': model, 'compute': model}.
+    """
+    X = df[FEATURES]
+    cores = os.cpu_count() or 1
+    total_jobs = cores if n_jobs in (None, -1) else max(1, n_jobs)
+    jobs_per_fit = max(1, total_jobs // len(TARGETS))
+
+    with ThreadPoolExecutor(max_workers=len(TARGETS)) as pool:
+        futures = {
+            name: pool.submit(fit_forest, X, df[column], n_estimators, max_depth, jobs_per_fit, max_samples, seed)
+            for name, column in TARGETS.items()
+        }
+        models = {}
+        for name, future in futures.items():
+            models[name], seconds = future.result()
+            print(f"{name.capitalize()} model trained.")
+            if timer is not None:
+                timer.timings[f"  fit {name} (concurrent)"] = seconds
+    return models
+
+
+def save_models(models, model_dir):
+    os.makedirs(model_dir, exist_ok=True)
+    for name, model in models.items():
+        joblib.dump(model, os.path.join(model_dir, f"optimizer_{name}.joblib"))
+    print(f"Models saved successfully to '{model_dir}' directory.")
+
+
+def export_compact_models(models, model_dir):
+    """Writes each forest as flattened .npy arrays (models/optimizer_<name>/), loaded by MLEngine in milliseconds."""
+    for name, model in models.items():
+        CompactForest.from_sklearn(model, FEATURES).save(os.path.join(model_dir, f"optimizer_{name}"))
+    print(f"Compact models exported to '{model_dir}' directory.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the optimizer's cost and compute surrogate models.")
+    parser.add_argument("--samples", type=int, default=50000, help="Number of synthetic samples (millions are fine).")
+    parser.add_argument("--estimators", type=int, default=50, help="Trees per forest.")
+    parser.add_argument("--max-depth", type=int, default=10, help="Maximum tree depth.")
+    parser.add_argument("--max-samples", type=float, default=None,
+                        help="Fraction of the samples each tree is trained on (speeds up large runs).")
+    parser.add_argument("--jobs", type=int, default=-1, help="CPU cores to use across both fits (-1 = all).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for sampling and training.")
+    parser.add_argument("--output-dir", default="models", help="Where to write the models.")
+    return parser.parse_args(argv)
 
-# 3. Define our features (X) and targets (y)
-features = ['ambient_temp_c', 'inlet_temp_c', 'server_workload_percent']
-X = df[features]
-y_cost = df['cost_per_day']
-y_compute = df['compute_output']
 
-print("Data generation complete. Training models...")
+def main(argv=None):
+    args = parse_args(argv)
+    timer = PhaseTimer()
+    print("Starting optimizer training script...")
 
-# 4. Train the Cost Prediction Model
-cost_model = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1, max_depth=10)
-cost_model.fit(X, y_cost)
-print("Cost model trained.")
+    # 1. Generate a large synthetic dataset with the Digital Twin physics
+    with timer(f"Generate {args.samples:,} samples"):
+        df = generate_dataset(args.samples, np.random.default_rng(args.seed))
 
-# 5. Train the Compute Prediction Model
-compute_model = RandomForestRegressor(n_estimators=50, random_state=42, n_jobs=-1, max_depth=10)
-compute_model.fit(X, y_compute)
-print("Compute model trained.")
+    # 2. Train the Cost and Compute Prediction Models (concurrently)
+    print("Data generation complete. Training models...")
+    with timer("Train models"):
+        models = train_models(df, n_estimators=args.estimators, max_depth=args.max_depth, n_jobs=args.jobs,
+                              max_samples=args.max_samples, seed=args.seed, timer=timer)
 
-# 6. Save models to disk
-model_dir = "models"
-os.makedirs(model_dir, exist_ok=True)
+    # 3. Save models to disk
+    with timer("Save models"):
+        save_models(models, args.output_dir)
 
-cost_model_path = os.path.join(model_dir, "optimizer_cost.joblib")
-compute_model_path = os.path.join(model_dir, "optimizer_compute.joblib")
+    # 4. Export the compact, memory-mappable format used at startup
+    with timer("Export compact models"):
+        export_compact_models(models, args.output_dir)
 
-joblib.dump(cost_model, cost_model_path)
-joblib.dump(compute_model, compute_model_path)
+    print("Optimizer training complete.")
+    timer.report()
 
-print(f"Models saved successfully to '{model_dir}' directory.")
-print("Optimizer training complete.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
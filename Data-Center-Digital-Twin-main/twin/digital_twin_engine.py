@@ -1,6 +1,8 @@
 import random
 from typing import Dict, Any
 
+import numpy as np
+
 class DataCenterTwin:
     """The core physics engine, now with a realistic cooling feedback loop."""
     def __init__(self):
@@ -20,6 +22,10 @@ class DataCenterTwin:
         # This simulates the air not getting cold enough if the system is overwhelmed.
         self.COOLING_DEFICIT_TEMP_FACTOR = 0.005 # e.g., a 100W deficit raises inlet temp by 0.5°C
 
+        # Compute output is throttled by THROTTLE_RATE per °C of outlet temp above the start
+        self.THROTTLE_START_TEMP_C = 38.0
+        self.THROTTLE_RATE_PER_C = 0.10
+
     def _get_cooling_strategy(self, temp_deviation, pue):
         if temp_deviation > 2.0: return "[bold red]CRITICAL: Boost All Cooling[/bold red]"
         elif temp_deviation > 0.5: return "[bold yellow]WARNING: Increase Cooling[/bold yellow]"
@@ -70,8 +76,90 @@ class DataCenterTwin:
         # --- This part is unchanged ---
         base_compute_output = (server_workload_percent / 100) * 10000
         throttling_penalty = 0.0
-        if outlet_temp_c > 38.0:
-            throttling_penalty = min(1.0, (outlet_temp_c - 38.0) * 0.10)
+        if outlet_temp_c > self.THROTTLE_START_TEMP_C:
+            throttling_penalty = min(1.0, (outlet_temp_c - self.THROTTLE_START_TEMP_C) * self.THROTTLE_RATE_PER_C)
+        final_compute_output = base_compute_output * (1 - throttling_penalty)
+
+        return {
+            "outlet_temp_c": outlet_temp_c, "temp_deviation_c": temp_deviation_c, "cooling_strategy": strategy,
+            "calculated_server_power_watts": server_power_watts, "cooling_unit_power_watts": cooling_unit_power_watts,
+            "calculated_pue": pue, "compute_output": final_compute_output
+        }
+
+    # --- NEW: Vectorized batch path ---
+    # Column names accepted when a DataFrame (or dict of columns) is passed in.
+    BATCH_INPUT_COLUMNS = ("server_workload_percent", "inlet_temp_c", "ambient_temp_c")
+
+    # Integer codes for the cooling strategy, in the order of _get_cooling_strategy.
+    STRATEGY_CRITICAL, STRATEGY_WARNING, STRATEGY_EFFICIENCY, STRATEGY_STABLE = 0, 1, 2, 3
+    STRATEGY_LABELS = (
+        "[bold red]CRITICAL: Boost All Cooling[/bold red]",
+        "[bold yellow]WARNING: Increase Cooling[/bold yellow]",
+        "[bold yellow]EFFICIENCY ALERT: Optimize Cooling[/bold yellow]",
+        "[bold green]STABLE: Monitor[/bold green]",
+    )
+
+    @staticmethod
+    def _batch_input(values, default):
+        """Mirrors the scalar `float(x or default)` handling for a whole column."""
+        arr = np.asarray(values, dtype=np.float64)
+        return np.where(arr == 0, default, arr)
+
+    def compute_batch(self, workload, inlet=None, ambient=None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized equivalent of compute_results for many racks at once.
+
+        Accepts three array-likes (workload %, target inlet °C, ambient °C), or a
+        single RackStateArray / DataFrame / dict holding the BATCH_INPUT_COLUMNS. Returns a dict of
+        NumPy arrays with the same keys and numbers as the scalar path, except that
+        "cooling_strategy" holds integer codes (see STRATEGY_LABELS).
+        """
+        if inlet is None and ambient is None:
+            columns = workload
+            workload, inlet, ambient = (columns[name] for name in self.BATCH_INPUT_COLUMNS)
+
+        server_workload_percent = np.asarray(workload, dtype=np.float64)
+        target_inlet_temp_c = self._batch_input(inlet, 22.0)
+        ambient_temp_c = self._batch_input(ambient, 25.0)
+
+        # 1. Server Power and Heat
+        server_power_watts = self.SERVER_IDLE_POWER_WATTS + \
+                             (server_workload_percent / 100) * (self.SERVER_MAX_POWER_WATTS - self.SERVER_IDLE_POWER_WATTS)
+        heat_generated = server_power_watts
+
+        # 2. Required cooling power and the ACTUAL inlet temperature
+        ambient_excess = np.maximum(0, ambient_temp_c - self.IDEAL_AMBIENT_TEMP_C)
+        required_cooling_power = (
+            self.COOLING_BASE_POWER_WATTS +
+            (heat_generated * self.COOLING_EFFICIENCY_FACTOR) +
+            ambient_excess * self.AMBIENT_TEMP_IMPACT_FACTOR +
+            np.maximum(0, self.IDEAL_INLET_TEMP_C - target_inlet_temp_c) * self.INLET_TEMP_IMPACT_FACTOR
+        )
+        ambient_strain_effect = ambient_excess * 0.1
+        workload_strain_effect = (server_power_watts / self.SERVER_MAX_POWER_WATTS) * 0.5
+        actual_inlet_temp_c = target_inlet_temp_c + ambient_strain_effect + workload_strain_effect
+
+        # 3. Outlet Temperature
+        outlet_temp_c = actual_inlet_temp_c + (server_power_watts * self.HEAT_DISSIPATION_FACTOR)
+
+        # 4. Final cooling power and metrics
+        cooling_unit_power_watts = required_cooling_power
+        total_power_watts = server_power_watts + cooling_unit_power_watts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pue = np.where(server_power_watts > 0, total_power_watts / server_power_watts, 0.0)
+        temp_deviation_c = outlet_temp_c - self.TARGET_OUTLET_TEMP_C
+        strategy = np.select(
+            [temp_deviation_c > 2.0, temp_deviation_c > 0.5, pue > 1.8],
+            [self.STRATEGY_CRITICAL, self.STRATEGY_WARNING, self.STRATEGY_EFFICIENCY],
+            default=self.STRATEGY_STABLE,
+        ).astype(np.int8)
+
+        base_compute_output = (server_workload_percent / 100) * 10000
+        throttling_penalty = np.where(
+            outlet_temp_c > self.THROTTLE_START_TEMP_C,
+            np.minimum(1.0, (outlet_temp_c - self.THROTTLE_START_TEMP_C) * self.THROTTLE_RATE_PER_C),
+            0.0,
+        )
         final_compute_output = base_compute_output * (1 - throttling_penalty)
 
         return {
@@ -80,7 +168,38 @@ class DataCenterTwin:
             "calculated_pue": pue, "compute_output": final_compute_output
         }
 
+    def inlet_breakpoints(self, workload, ambient) -> np.ndarray:
+        """
+        Target inlet temperatures (°C) at which the physics changes regime, for
+        each (workload, ambient) pair. Returns an (n, 3) array:
+          - IDEAL_INLET_TEMP_C, below which extra cooling power is drawn,
+          - the inlet at which the outlet reaches the throttle start,
+          - the inlet at which throttling reaches 100%.
+        Between two breakpoints cost and compute are linear in the inlet, so
+        every profile's optimum over the inlet lies on a breakpoint (or a
+        domain bound).
+        """
+        server_workload_percent = np.asarray(workload, dtype=np.float64)
+        ambient_temp_c = self._batch_input(ambient, 25.0)
+        server_power_watts = self.SERVER_IDLE_POWER_WATTS + \
+                             (server_workload_percent / 100) * (self.SERVER_MAX_POWER_WATTS - self.SERVER_IDLE_POWER_WATTS)
+        # outlet = target inlet + offset, with the offset independent of the inlet
+        outlet_offset_c = (
+            np.maximum(0, ambient_temp_c - self.IDEAL_AMBIENT_TEMP_C) * 0.1 +
+            (server_power_watts / self.SERVER_MAX_POWER_WATTS) * 0.5 +
+            server_power_watts * self.HEAT_DISSIPATION_FACTOR
+        )
+        throttle_start = self.THROTTLE_START_TEMP_C - outlet_offset_c
+        return np.column_stack([
+            np.full_like(throttle_start, self.IDEAL_INLET_TEMP_C),
+            throttle_start,
+            throttle_start + 1.0 / self.THROTTLE_RATE_PER_C,
+        ])
+
 _twin_engine_instance = DataCenterTwin()
 def compute_results(payload: Dict[str, Any]) -> Dict[str, Any]:
     return _twin_engine_instance.compute_results(payload)
 
+def compute_batch(workload, inlet=None, ambient=None) -> Dict[str, np.ndarray]:
+    return _twin_engine_instance.compute_batch(workload, inlet, ambient)
+
@@ -0,0 +1,87 @@
+"""
+History storage and decimation for the dashboard trend charts (Qt-free).
+"""
+import numpy as np
+
+class RingBuffer:
+    """
+    Fixed-capacity history of floats with O(1) appends.
+
+    Every value is written twice, `capacity` apart, so the most recent n
+    values are always one contiguous slice: `latest()` returns a view,
+    never a copy, however often the buffer has wrapped.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity)
+        self._next = 0 # Next write position, in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._next] = self._data[self._next + self.capacity] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def latest(self, n=None):
+        """The last n values (all by default), oldest first, as a read-only view."""
+        n = self._count if n is None else min(n, self._count)
+        end = self._next + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+
+
+def minmax_decimate(values, buckets):
+    """
+    Reduces `values` for drawing into `buckets` pixel columns: each bucket
+    keeps its minimum and maximum (in time order), so peaks and dips survive
+    any zoom level. The first and last points are always kept.
+    Returns (indices into values, values at those indices).
+    """
+    n = len(values)
+    if buckets <= 0 or n <= 2 * buckets:
+        return np.arange(n), np.asarray(values)
+
+    size = -(-n // buckets) # ceil
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = values
+    padded = padded.reshape(rows, size)
+    offsets = np.arange(rows) * size
+    lows = offsets + np.nanargmin(padded, axis=1)
+    highs = offsets + np.nanargmax(padded, axis=1)
+
+    indices = np.empty(2 * rows + 2, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    indices[1:-1:2] = np.minimum(lows, highs)
+    indices[2:-1:2] = np.maximum(lows, highs)
+    indices = np.unique(indices) # Sorted, duplicates (flat buckets) removed
+    return indices, np.asarray(values)[indices]
+
+
+def area_fill(xs, ys, width, height, rgb, max_alpha=90):
+    """
+    Rasterizes the area under a line as a (height, width) array of
+    premultiplied ARGB32 pixels. xs, ys are in the area's pixel coordinates
+    (y down, sorted by x); everything below the line is filled with `rgb`,
+    fading from `max_alpha` at the top of the area to transparent at the
+    bottom. Columns holding several points fill from the highest one.
+    """
+    top = np.interp(np.arange(width) + 0.5, xs, ys, left=np.inf, right=np.inf)
+    columns = xs.astype(np.intp)
+    inside = (columns >= 0) & (columns < width)
+    np.minimum.at(top, columns[inside], ys[inside])
+
+    rows = np.arange(height) + 0.5
+    alpha = (max_alpha * (1 - rows / height)).astype(np.uint32)
+    r, g, b = (alpha * channel // 255 for channel in rgb)
+    row_colors = (alpha << 24) | (r << 16) | (g << 8) | b
+    return np.where(rows[:, None] >= top[None, :], row_colors[:, None], np.uint32(0))
@@ -0,0 +1,67 @@
+"""
+Heatmap colour scale shared by the Qt dashboard and the Unity client.
+
+Kept free of Qt imports so the Unity bridge can use it headless.
+"""
+import numpy as np
+
+# (temperature °C, (r, g, b, a)) stops, adjusted for better shallow colour perception
+HEATMAP_STOPS = (
+    (20.0, (0, 0, 139, 255)),    # Dark Blue (cool)
+    (27.0, (0, 128, 0, 255)),    # Green
+    (32.0, (255, 255, 0, 255)),  # Yellow
+    (36.0, (255, 165, 0, 255)),  # Orange
+    (39.0, (255, 0, 0, 255)),    # Red
+    (45.0, (139, 0, 0, 255)),    # Dark Red (hot)
+)
+
+class TemperatureColorLUT:
+    """
+    Temperature -> RGBA lookup table, quantized to `resolution` °C between the
+    first and last stop (temperatures outside clamp to the end colours).
+
+    Built once; colouring is then an index computation and an array gather.
+    `indices()` are the compact palette indices sent to Unity, which looks
+    them up in the same table (see `export()`).
+    """
+
+    def __init__(self, stops=HEATMAP_STOPS, resolution=0.01):
+        stops = sorted(stops, key=lambda stop: stop[0])
+        temps = np.array([temp for temp, _ in stops], dtype=float)
+        channels = np.array([color for _, color in stops], dtype=float)
+        self.min_temp, self.max_temp = float(temps[0]), float(temps[-1])
+        self.resolution = resolution
+
+        size = int(round((self.max_temp - self.min_temp) / resolution)) + 1
+        samples = self.min_temp + np.arange(size) * resolution
+        # (size, 4) uint8 RGBA, linear between stops per channel
+        self.rgba = np.column_stack([np.interp(samples, temps, channels[:, i]) for i in range(4)]) \
+                      .astype(np.uint8)
+        r, g, b, a = (self.rgba[:, i].astype(np.uint32) for i in range(4))
+        self.argb32 = (a << 24) | (r << 16) | (g << 8) | b # QImage.Format_ARGB32 pixels
+
+    def __len__(self):
+        return len(self.rgba)
+
+    def indices(self, temps):
+        """Palette index of each temperature (nearest 0.01 °C step, clamped)."""
+        scaled = (np.asarray(temps, dtype=float) - self.min_temp) * (1 / self.resolution)
+        # Clamp, then +0.5 so truncation rounds to the nearest entry
+        return (np.clip(scaled, 0, len(self.rgba) - 1) + 0.5).astype(np.uint16)
+
+    def colors(self, temps):
+        """(n, 4) uint8 RGBA colours for the given temperatures."""
+        return self.rgba[self.indices(temps)]
+
+    def export(self):
+        """JSON-ready description of the table: colours packed as 0xRRGGBB ints."""
+        r, g, b = (self.rgba[:, i].astype(np.int64) for i in range(3))
+        return {
+            "min_temp": self.min_temp,
+            "max_temp": self.max_temp,
+            "resolution": self.resolution,
+            "colors": ((r << 16) | (g << 8) | b).tolist(),
+        }
+
+# Shared default table
+HEATMAP_LUT = TemperatureColorLUT()
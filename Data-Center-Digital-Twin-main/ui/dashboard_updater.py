@@ -0,0 +1,56 @@
+"""
+Frame-coalesced, diffed application of dashboard view-models.
+"""
+from PyQt5.QtCore import QObject, QTimer
+
+_UNSET = object()
+
+class DashboardUpdater(QObject):
+    """
+    Applies the dashboard's view-model at most once per display frame.
+
+    `submit(*state)` only stores the latest state; the first submission after
+    a flush starts a one-frame timer, so any number of ticks arriving within
+    a frame cost one application. On flush, `build(*state)` returns the
+    view-model as (key, value, apply, page) items: `apply(value)` is called
+    only when `value` differs from the one last applied for `key`, and only
+    while `page` (a tab page, or None for always) is visible. Widgets on
+    hidden pages are left untouched; switching tabs triggers a flush that
+    brings the newly shown page up to date.
+    """
+    FRAME_INTERVAL_MS = 16
+
+    def __init__(self, build, tabs=None, frame_interval_ms=FRAME_INTERVAL_MS):
+        super().__init__()
+        self.build = build
+        self._state = None
+        self._applied = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_interval_ms)
+        self._timer.timeout.connect(self.flush)
+        if tabs is not None:
+            tabs.currentChanged.connect(lambda _index: self.schedule())
+
+    def submit(self, *state):
+        self._state = state
+        self.schedule()
+
+    def schedule(self):
+        if self._state is not None and not self._timer.isActive():
+            self._timer.start()
+
+    def invalidate(self, key):
+        """Forgets the applied value of `key` (e.g. after the widget was changed directly)."""
+        self._applied.pop(key, None)
+
+    def flush(self):
+        if self._state is None:
+            return
+        for key, value, apply, page in self.build(*self._state):
+            if page is not None and not page.isVisible():
+                continue
+            if self._applied.get(key, _UNSET) == value:
+                continue
+            apply(value)
+            self._applied[key] = value
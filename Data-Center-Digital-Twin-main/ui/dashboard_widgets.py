@@ -5,145 +5,102 @@ Includes charts, gauges, and enhanced visualizations.
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame
 from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer, QObject, pyqtSignal, QThread, pyqtSlot
 from PyQt5.QtGui import (QPainter, QColor, QPen, QBrush, QFont, QPainterPath, 
-                         QLinearGradient, QPixmap, QImage, QRadialGradient) 
-from collections import deque
+                         QLinearGradient, QPixmap, QImage, QRadialGradient, QPolygonF) 
 import math
-import copy # <-- Import copy for deepcopy
-
-# --- Helper function for color interpolation ---
-def interpolate_color(color1, color2, ratio):
-    """Interpolates between two QColors."""
-    if not isinstance(color1, QColor) or not isinstance(color2, QColor):
-        return QColor(0,0,0) # Return black on error
-    r = int(color1.red() * (1 - ratio) + color2.red() * ratio)
-    g = int(color1.green() * (1 - ratio) + color2.green() * ratio)
-    b = int(color1.blue() * (1 - ratio) + color2.blue() * ratio)
-    a = int(color1.alpha() * (1 - ratio) + color2.alpha() * ratio)
-    return QColor(r, g, b, a)
+
+import numpy as np
+
+from ml.rack_models import RackModelBank
+from ui.chart_data import RingBuffer, area_fill, minmax_decimate
+from ui.colormap import HEATMAP_LUT
+from ui.heatmap_raster import HeatmapRasterizer
 
 # --- Worker thread for generating the heatmap ---
 class HeatmapWorker(QObject):
-    """Runs the slow heatmap generation in a background thread."""
-    finished = pyqtSignal(QPixmap)
+    """Rasterizes the heatmap in a background thread (see HeatmapRasterizer)."""
+    finished = pyqtSignal(QImage)
 
-    def __init__(self, rows, cols, get_color_func, img_width, img_height):
+    def __init__(self, rows, cols, color_lut, img_width, img_height):
         super().__init__()
-        self.rows = rows
-        self.cols = cols
-        self.get_color_for_temp = get_color_func
-        self.img_width = img_width
-        self.img_height = img_height
+        self.rasterizer = HeatmapRasterizer(rows, cols, img_width, img_height, color_lut)
         self.is_busy = False
 
-    # --- NEW: Function to pre-smooth the data ---
-    def _create_smoothed_grid(self, temp_grid):
-        """Averages each rack with its neighbors to create smooth zones."""
-        smoothed_grid = copy.deepcopy(temp_grid) # Start with a copy
-        
-        for r in range(self.rows):
-            for c in range(self.cols):
-                total_temp = 0
-                count = 0
-                
-                # Loop through 3x3 neighbors
-                for dr in [-1, 0, 1]:
-                    for dc in [-1, 0, 1]:
-                        nr, nc = r + dr, c + dc
-                        # Check if neighbor is valid
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            total_temp += temp_grid[nr][nc]
-                            count += 1
-                
-                # Set the new smoothed temperature
-                if count > 0:
-                    smoothed_grid[r][c] = total_temp / count
-                    
-        return smoothed_grid
-
     @pyqtSlot(list)
     def generate_map(self, temps):
-        """Generates the heatmap pixmap."""
-        if self.is_busy:
+        """Generates the heatmap image (converted to a pixmap on the GUI thread)."""
+        if self.is_busy or not temps:
             return
         self.is_busy = True
-
-        if not temps:
+        try:
+            image = self.rasterizer.render(temps)
+        finally:
             self.is_busy = False
-            return
+        self.finished.emit(image)
 
-        # Create a 2D grid of temperatures
-        temp_grid = []
-        idx = 0
-        for r in range(self.rows):
-            row_data = []
-            for c in range(self.cols):
-                if idx < len(temps):
-                    row_data.append(temps[idx])
-                    idx += 1
-                else:
-                    row_data.append(25.0) 
-            temp_grid.append(row_data)
-
-        # --- FIX: Run the smoothing pass FIRST ---
-        smoothed_temp_grid = self._create_smoothed_grid(temp_grid)
-
-        # Create a QImage for pixel-by-pixel drawing
-        img = QImage(self.img_width, self.img_height, QImage.Format_ARGB32)
-        img.fill(QColor("#1A1A2E")) 
-
-        # Calculate cell dimensions
-        cell_width = self.img_width / (self.cols - 1) if self.cols > 1 else 0
-        cell_height = self.img_height / (self.rows - 1) if self.rows > 1 else 0
-        
-        if cell_width == 0 or cell_height == 0:
-            self.is_busy = False
-            return 
 
-        # Iterate over each pixel in the QImage
-        for y_pixel in range(self.img_height):
-            for x_pixel in range(self.img_width):
-                
-                # --- FIX (GLITCH): Corrected range mapping math ---
-                grid_x = x_pixel * (self.cols - 1) / (self.img_width - 1)
-                grid_y = y_pixel * (self.rows - 1) / (self.img_height - 1)
+class HeatmapRenderService(QObject):
+    """
+    One background rasterizer shared by any number of EnhancedHeatmap views.
 
-                x0 = int(grid_x)
-                y0 = int(grid_y)
-                
-                # Clamp to avoid edge cases
-                x0 = max(0, min(self.cols - 2, x0))
-                y0 = max(0, min(self.rows - 2, y0))
-                
-                x1 = x0 + 1
-                y1 = y0 + 1
+    Submissions are coalesced: all `submit()` calls made in one event-loop
+    turn (e.g. every view updated by the same tick) produce a single render,
+    whose pixmap is handed to every registered view to draw at its own size.
+    Nothing is rendered while none of the views is visible (e.g. they sit on
+    inactive QTabWidget pages); the latest data is rendered when one is shown.
+    """
+    HEATMAP_IMG_WIDTH = 1000
+    HEATMAP_IMG_HEIGHT = 500
 
-                fx = grid_x - x0
-                fy = grid_y - y0
-                # --- End of Glitch Fix ---
-                
-                try:
-                    # --- Use the SMOOTHED grid for interpolation ---
-                    temp00 = smoothed_temp_grid[y0][x0]
-                    temp10 = smoothed_temp_grid[y0][x1]
-                    temp01 = smoothed_temp_grid[y1][x0]
-                    temp11 = smoothed_temp_grid[y1][x1]
-                except IndexError:
-                    continue 
-
-                color00 = self.get_color_for_temp(temp00)
-                color10 = self.get_color_for_temp(temp10)
-                color01 = self.get_color_for_temp(temp01)
-                color11 = self.get_color_for_temp(temp11)
-
-                color_top = interpolate_color(color00, color10, fx)
-                color_bottom = interpolate_color(color01, color11, fx)
-                
-                final_color = interpolate_color(color_top, color_bottom, fy)
+    request_new_map = pyqtSignal(list)
 
-                img.setPixelColor(x_pixel, y_pixel, final_color)
+    def __init__(self, rows=20, cols=35, color_lut=HEATMAP_LUT):
+        super().__init__()
+        self.views = []
+        self.pixmap = QPixmap(self.HEATMAP_IMG_WIDTH, self.HEATMAP_IMG_HEIGHT)
+        self.pixmap.fill(QColor("#1A1A2E"))
+        self._pending = None # Latest temps not rendered yet
+        self._scheduled = False
 
-        self.is_busy = False
-        self.finished.emit(QPixmap.fromImage(img))
+        self.heatmap_thread = QThread()
+        self.heatmap_worker = HeatmapWorker(rows, cols, color_lut, self.HEATMAP_IMG_WIDTH, self.HEATMAP_IMG_HEIGHT)
+        self.heatmap_worker.moveToThread(self.heatmap_thread)
+        self.heatmap_worker.finished.connect(self.on_image_ready)
+        self.request_new_map.connect(self.heatmap_worker.generate_map)
+        self.heatmap_thread.finished.connect(self.heatmap_worker.deleteLater)
+        self.heatmap_thread.start()
+        print("Heatmap worker thread started.")
+
+    def register(self, view):
+        self.views.append(view)
+        view.on_pixmap_ready(self.pixmap)
+
+    def submit(self, temps):
+        """Queues `temps` for rendering; superseded by later submissions in the same turn."""
+        self._pending = temps
+        self.request_render()
+
+    def request_render(self):
+        if self._pending is not None and not self._scheduled:
+            self._scheduled = True
+            QTimer.singleShot(0, self._render)
+
+    def _render(self):
+        self._scheduled = False
+        if self._pending is None or not any(view.isVisible() for view in self.views):
+            return # Kept pending until a view is shown
+        temps, self._pending = self._pending, None
+        self.request_new_map.emit(temps)
+
+    @pyqtSlot(QImage)
+    def on_image_ready(self, image):
+        self.pixmap = QPixmap.fromImage(image)
+        for view in self.views:
+            view.on_pixmap_ready(self.pixmap)
+
+    def shutdown(self):
+        """Stops the worker thread."""
+        self.heatmap_thread.quit()
+        self.heatmap_thread.wait()
 
 
 class MetricGauge(QWidget):
@@ -326,50 +283,137 @@ class TrendChart(QWidget):
     """
     Line chart widget, with support for a second (forecast) series
     and gradient fill.
+
+    Keeps a long history (`history` points) in a ring buffer and shows the
+    most recent `window` of it (`max_points` by default; the mouse wheel
+    zooms out to hours of ticks and back). Series longer than the chart is
+    wide are min/max decimated to its pixel width, and the static layer
+    (title, frame, grid, axis labels) and the series layer are cached as
+    pixmaps, so repaints cost about the same at any zoom.
     """
-    
+    MIN_WINDOW = 10
+    WIDE_PEN_SPACING = 3 # Min pixels between points for the 3px line
+
     def __init__(self, title="Trend", max_points=50, y_label="Value", color="#4D96FF", 
-                 forecast_steps=30, goal_text=None, y_min=None, y_max=None):
+                 forecast_steps=30, goal_text=None, y_min=None, y_max=None, history=14400):
         super().__init__()
         self.title = title
         self.y_label = y_label
         self.color = QColor(color)
         self.max_points = max_points
         self.forecast_steps = forecast_steps
-        self.data_points = deque(maxlen=max_points)
+        self.history = RingBuffer(max(history, max_points))
+        self.window = max_points
         self.forecast_points = []
         
         self.goal_text = goal_text
         self.y_min = y_min
         self.y_max = y_max
+
+        self._static_layer = None # (key, pixmap)
+        self._series_layer = None
+        self._revision = 0 # Bumped whenever the series changes
         
         self.setMinimumSize(400, 300) 
+
+    @property
+    def data_points(self):
+        """The points currently shown (the last `window` of the history)."""
+        return self.history.latest(self.window)
         
-    def add_data_point(self, value):
+    def add_data_point(self, value, repaint=True):
         if self.y_min is not None and value < self.y_min:
             value = self.y_min
         if self.y_max is not None and value > self.y_max:
             value = self.y_max
             
-        self.data_points.append(value)
-        self.update()
+        self.history.append(value)
+        self._revision += 1
+        if repaint:
+            self.update()
     
     def update_forecast_data(self, forecast_data):
         self.forecast_points = forecast_data
+        self._revision += 1
         self.update()
         
     def clear_data(self):
-        self.data_points.clear()
+        self.history.clear()
         self.forecast_points = []
+        self._revision += 1
         self.update()
-        
+
+    def set_window(self, points):
+        """Shows the last `points` ticks of the history."""
+        self.window = int(max(self.MIN_WINDOW, min(self.history.capacity, points)))
+        self._revision += 1
+        self.update()
+
+    def wheelEvent(self, event):
+        # Scroll up zooms in (fewer ticks), scroll down zooms out
+        factor = 0.5 if event.angleDelta().y() > 0 else 2
+        self.set_window(self.window * factor)
+        event.accept()
+
+    def _chart_rect(self):
+        rect = self.rect()
+        margin = 50
+        return QRectF(margin, margin + 20, rect.width() - margin * 2, rect.height() - margin * 2 - 20)
+
+    def _new_layer(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        return pixmap
+
+    @staticmethod
+    def _polygon(xs, ys):
+        """QPolygonF filled straight from coordinate arrays (no per-point Python)."""
+        polygon = QPolygonF(len(xs))
+        buffer = polygon.data()
+        buffer.setsize(len(xs) * 2 * np.dtype(np.float64).itemsize)
+        coords = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+        coords[:, 0] = xs
+        coords[:, 1] = ys
+        return polygon
+
     def paintEvent(self, event):
+        points = self.data_points
+        forecast = np.asarray(self.forecast_points, dtype=float)
+        if self.y_min is not None and self.y_max is not None:
+            min_val = self.y_min
+            max_val = self.y_max
+        elif len(points) or len(forecast):
+            all_points = np.concatenate([points, forecast])
+            min_val, max_val = float(all_points.min()), float(all_points.max())
+        else:
+            min_val, max_val = 0, 1
+
         painter = QPainter(self)
+        static_key = (self.size(), min_val, max_val)
+        if self._static_layer is None or self._static_layer[0] != static_key:
+            self._static_layer = (static_key, self._render_static(min_val, max_val))
+        painter.drawPixmap(0, 0, self._static_layer[1])
+
+        if len(points) < 2:
+            painter.setPen(QColor("#95A5A6"))
+            painter.setFont(QFont("Segoe UI", 10))
+            painter.drawText(self._chart_rect(), Qt.AlignCenter, "Collecting data...")
+            return
+
+        series_key = (self.size(), self._revision, min_val, max_val)
+        if self._series_layer is None or self._series_layer[0] != series_key:
+            self._series_layer = (series_key, self._render_series(points, forecast, min_val, max_val))
+        painter.drawPixmap(0, 0, self._series_layer[1])
+
+    def _render_static(self, min_val, max_val):
+        layer = self._new_layer()
+        painter = QPainter(layer)
         painter.setRenderHint(QPainter.Antialiasing)
-        
         rect = self.rect()
+        chart_rect = self._chart_rect()
         margin = 50
-        chart_rect = QRectF(margin, margin + 20, rect.width() - margin * 2, rect.height() - margin * 2 - 20)
         
         # Draw title
         painter.setPen(QColor("#BDC3C7"))
@@ -384,22 +428,7 @@ class TrendChart(QWidget):
         painter.fillRect(chart_rect, QColor("#1A1A2E"))
         painter.setPen(QPen(QColor("#3D3D5C"), 1))
         painter.drawRect(chart_rect)
-        
-        if len(self.data_points) < 2:
-            painter.setPen(QColor("#95A5A6"))
-            painter.setFont(QFont("Segoe UI", 10))
-            painter.drawText(chart_rect, Qt.AlignCenter, "Collecting data...")
-            return
-        
-        all_points = list(self.data_points) + self.forecast_points
-        
-        if self.y_min is not None and self.y_max is not None:
-            min_val = self.y_min
-            max_val = self.y_max
-        else:
-            min_val = min(all_points) if all_points else 0
-            max_val = max(all_points) if all_points else 1
-            
+
         value_range = max_val - min_val if max_val != min_val else 1
         
         painter.setPen(QPen(QColor("#3D3D5C"), 1, Qt.DotLine))
@@ -407,82 +436,6 @@ class TrendChart(QWidget):
         for i in range(num_grid_lines):
             y = chart_rect.top() + (chart_rect.height() / (num_grid_lines - 1)) * i
             painter.drawLine(int(chart_rect.left()), int(y), int(chart_rect.right()), int(y))
-        
-        
-        points = list(self.data_points)
-        
-        total_x_points = (self.max_points - 1) + self.forecast_steps
-        if total_x_points == 0: total_x_points = 1
-        x_step = chart_rect.width() / total_x_points
-        
-        line_path = QPainterPath()
-        fill_path = QPainterPath()
-        
-        current_x_offset = (self.max_points - len(points)) * x_step
-        start_x = chart_rect.left() + current_x_offset
-        
-        fill_path.moveTo(start_x, chart_rect.bottom())
-
-        first_value = points[0]
-        first_y = chart_rect.bottom() - (((first_value - min_val) / value_range) * chart_rect.height())
-
-        line_path.moveTo(start_x, first_y)
-        fill_path.lineTo(start_x, first_y)
-
-        last_x = start_x
-        for i, value in enumerate(points[1:], 1):
-            y_ratio = (value - min_val) / value_range
-            x = chart_rect.left() + current_x_offset + (i * x_step)
-            y = chart_rect.bottom() - (y_ratio * chart_rect.height())
-            
-            line_path.lineTo(x, y)
-            fill_path.lineTo(x, y)
-            last_x = x
-
-        fill_path.lineTo(last_x, chart_rect.bottom())
-        fill_path.lineTo(chart_rect.left() + current_x_offset, chart_rect.bottom())
-        fill_path.closeSubpath()
-
-        gradient = QLinearGradient(chart_rect.center().x(), chart_rect.top(), chart_rect.center().x(), chart_rect.bottom())
-        gradient_color = QColor(self.color)
-        gradient_color.setAlpha(90)
-        gradient.setColorAt(0, gradient_color)
-        gradient_color.setAlpha(0)
-        gradient.setColorAt(1, gradient_color)
-        
-        painter.setBrush(QBrush(gradient))
-        painter.setPen(Qt.NoPen)
-        painter.drawPath(fill_path)
-
-        painter.setBrush(Qt.NoBrush)
-        painter.setPen(QPen(self.color, 3))
-        painter.drawPath(line_path)
-        
-        
-        if self.forecast_points and len(self.data_points) > 0:
-            forecast_path = QPainterPath()
-            
-            last_actual_value = points[-1]
-            last_actual_x = last_x
-            last_actual_y = chart_rect.bottom() - (((last_actual_value - min_val) / value_range) * chart_rect.height())
-            forecast_path.moveTo(last_actual_x, last_actual_y)
-            
-            for i, value in enumerate(self.forecast_points):
-                if self.y_min is not None and value < self.y_min: value = self.y_min
-                if self.y_max is not None and value > self.y_max: value = self.y_max
-                
-                y_ratio = (value - min_val) / value_range
-                x = last_actual_x + ((i + 1) * x_step)
-                y = chart_rect.bottom() - (y_ratio * chart_rect.height())
-                
-                if x > chart_rect.right() + 5:
-                    break
-                    
-                forecast_path.lineTo(x, y)
-
-            forecast_pen = QPen(self.color.lighter(110), 3, Qt.DotLine)
-            painter.setPen(forecast_pen)
-            painter.drawPath(forecast_path)
 
         painter.setPen(QColor("#95A5A6"))
         painter.setFont(QFont("Segoe UI", 8))
@@ -490,10 +443,61 @@ class TrendChart(QWidget):
             y = chart_rect.top() + (chart_rect.height() / (num_grid_lines - 1)) * i
             value = max_val - (value_range / (num_grid_lines - 1)) * i
             painter.drawText(QRectF(5, y - 10, margin - 10, 20), Qt.AlignRight | Qt.AlignVCenter, f"{value:.1f}")
+        painter.end()
+        return layer
+
+    def _render_series(self, points, forecast, min_val, max_val):
+        layer = self._new_layer()
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.Antialiasing)
+        chart_rect = self._chart_rect()
+        value_range = max_val - min_val if max_val != min_val else 1
+
+        # The history window takes the share of the width it has at the default
+        # zoom (max_points); the rest is kept for the forecast at any zoom
+        span = (self.max_points - 1) + self.forecast_steps
+        if span == 0: span = 1
+        history_width = chart_rect.width() * (self.max_points - 1) / span
+        forecast_step = chart_rect.width() / span
+        x_step = history_width / max(1, self.window - 1)
+
+        # Right-aligned: the newest point sits at the end of the history area
+        indices, values = minmax_decimate(points, int(history_width))
+        xs = chart_rect.left() + (self.window - len(points) + indices) * x_step
+        ys = chart_rect.bottom() - ((values - min_val) / value_range) * chart_rect.height()
+
+        # Gradient fill under the line, rasterized in NumPy (a jagged polygon is slow to fill in QPainter)
+        width, height = int(chart_rect.width()), int(chart_rect.height())
+        if width > 0 and height > 0:
+            pixels = area_fill(xs - chart_rect.left(), ys - chart_rect.top(), width, height,
+                               (self.color.red(), self.color.green(), self.color.blue()))
+            fill = QImage(pixels.data, width, height, width * 4, QImage.Format_ARGB32_Premultiplied)
+            painter.drawImage(chart_rect.topLeft(), fill)
+
+        # Dense windows draw a hairline: the min/max zigzag already reads as a
+        # solid envelope, and stroking it with a wide pen is very slow
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(QPen(self.color, 3 if x_step >= self.WIDE_PEN_SPACING else 1))
+        painter.drawPolyline(self._polygon(xs, ys))
+
+        if len(forecast):
+            if self.y_min is not None or self.y_max is not None:
+                forecast = np.clip(forecast, self.y_min, self.y_max)
+            steps = np.arange(1, len(forecast) + 1)
+            forecast_xs = xs[-1] + steps * forecast_step
+            keep = forecast_xs <= chart_rect.right() + 5
+            forecast_ys = chart_rect.bottom() - ((forecast[keep] - min_val) / value_range) * chart_rect.height()
+
+            painter.setPen(QPen(self.color.lighter(110), 3, Qt.DotLine))
+            painter.drawPolyline(self._polygon(np.concatenate([[xs[-1]], forecast_xs[keep]]),
+                                               np.concatenate([[ys[-1]], forecast_ys])))
+        painter.end()
+        return layer
 
 
 class AlertPanel(QFrame):
     """Panel for displaying system alerts and warnings."""
+    FRAME_INTERVAL_MS = 16
     
     def __init__(self):
         super().__init__()
@@ -520,6 +524,12 @@ class AlertPanel(QFrame):
         layout.addStretch()
         
         self.alerts = []
+        # Messages raised during the current display frame; a burst of ticks re-raises the same ones
+        self._frame_messages = set()
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self._frame_messages.clear)
         
     def add_alert(self, message, severity="info"):
         """Add an alert message. Severity: info, warning, critical, good"""
@@ -527,6 +537,11 @@ class AlertPanel(QFrame):
             last_alert_text = self.alerts[-1].text()
             if message in last_alert_text:
                 return
+        if message in self._frame_messages:
+            return
+        self._frame_messages.add(message)
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
         
         colors = {
             "info": "#4D96FF",
@@ -566,91 +581,56 @@ class AlertPanel(QFrame):
             self.alerts_layout.removeWidget(alert)
             alert.deleteLater()
         self.alerts.clear()
+        self._frame_messages.clear()
 
 
 class EnhancedHeatmap(QWidget):
-    """Enhanced heatmap with hover tooltips and rack details."""
-    
-    # --- FIX (SMOOTHER): Drastically reduced internal heatmap resolution ---
-    HEATMAP_IMG_WIDTH = 50  # Was 200
-    HEATMAP_IMG_HEIGHT = 25 # Was 100
+    """
+    Enhanced heatmap with hover tooltips and rack details.
 
-    request_new_map = pyqtSignal(list)
+    The image comes from a HeatmapRenderService; views that share one
+    (e.g. the overview and thermal tabs) share a single render per tick.
+    """
 
-    def __init__(self, rows=20, cols=35):
+    def __init__(self, rows=20, cols=35, render_service=None):
         super().__init__()
         self.rows, self.cols = rows, cols
         self.rack_temps = [25.0] * (rows * cols)
         self.rack_workloads = [50.0] * (rows * cols)
+        self.rack_statuses = []
+        self.flagged_racks = [] # Racks raised by the per-rack models (marked with an outline)
         self.setMinimumHeight(300)
         self.setMouseTracking(True)
         self.hover_rack = -1
         
-        # --- FIX (COLOR MAP): Adjusted thresholds for better shallow color perception ---
-        self.color_map = [
-            (20.0, QColor(0, 0, 139, 255)),    # Dark Blue (cool)
-            (27.0, QColor(0, 128, 0, 255)),    # Green (starts 1 degree earlier)
-            (32.0, QColor(255, 255, 0, 255)),  # Yellow (starts 1 degree earlier)
-            (36.0, QColor(255, 165, 0, 255)),  # Orange (starts 1 degree earlier)
-            (39.0, QColor(255, 0, 0, 255)),    # Red (starts 1 degree earlier)
-            (45.0, QColor(139, 0, 0, 255))     # Dark Red (hot)
-        ]
-        # --- End of Color Fix ---
-        
-        self.color_map.sort(key=lambda x: x[0])
-
-        self.heatmap_pixmap = QPixmap(self.HEATMAP_IMG_WIDTH, self.HEATMAP_IMG_HEIGHT)
-        self.heatmap_pixmap.fill(QColor("#1A1A2E")) 
+        # Quantized colour table shared with the Unity client (ui/colormap.py)
+        self.color_lut = HEATMAP_LUT
 
-        self.heatmap_thread = QThread()
-        self.heatmap_worker = HeatmapWorker(
-            self.rows, self.cols, self.get_color_for_temp,
-            self.HEATMAP_IMG_WIDTH, self.HEATMAP_IMG_HEIGHT
-        )
-        self.heatmap_worker.moveToThread(self.heatmap_thread)
-        
-        self.heatmap_worker.finished.connect(self.on_pixmap_ready)
-        self.request_new_map.connect(self.heatmap_worker.generate_map)
-        
-        # --- Make sure thread quits when app closes ---
-        self.heatmap_thread.finished.connect(self.heatmap_worker.deleteLater)
-        self.heatmap_thread.start()
-        print("Heatmap worker thread started.")
+        # A standalone heatmap owns its own render service
+        self.owns_render_service = render_service is None
+        self.render_service = render_service or HeatmapRenderService(rows, cols, self.color_lut)
+        self.render_service.register(self)
     
-    # --- Add this function to properly shut down the thread ---
     def closeEvent(self, event):
-        """Clean up the thread when the widget is closed."""
-        self.heatmap_thread.quit()
-        self.heatmap_thread.wait()
+        """Clean up the render thread when a standalone heatmap is closed."""
+        if self.owns_render_service:
+            self.render_service.shutdown()
         super().closeEvent(event)
 
-    @pyqtSlot(QPixmap)
+    def showEvent(self, event):
+        # Renders skipped while hidden catch up as soon as the view is shown
+        self.render_service.request_render()
+        super().showEvent(event)
+
     def on_pixmap_ready(self, pixmap):
         self.heatmap_pixmap = pixmap
         self.update() 
 
     def get_color_for_temp(self, temp):
-        if not self.color_map:
-            return QColor(0,0,0) 
-            
-        if temp <= self.color_map[0][0]:
-            return self.color_map[0][1]
-        if temp >= self.color_map[-1][0]:
-            return self.color_map[-1][1]
-
-        for i in range(len(self.color_map) - 1):
-            temp1, color1 = self.color_map[i]
-            temp2, color2 = self.color_map[i+1]
-            
-            if temp1 <= temp <= temp2:
-                if (temp2 - temp1) == 0:
-                    return color1
-                ratio = (temp - temp1) / (temp2 - temp1)
-                return interpolate_color(color1, color2, ratio)
-                
-        return self.color_map[0][1] 
+        r, g, b, a = self.color_lut.colors([temp])[0].tolist()
+        return QColor(r, g, b, a)
 
-    def update_data(self, temps, workloads=None):
+    def update_data(self, temps, workloads=None, statuses=None, flagged=None):
         if not temps: 
              self.rack_temps = [25.0] * (self.rows * self.cols)
         else:
@@ -658,8 +638,12 @@ class EnhancedHeatmap(QWidget):
             
         if workloads:
             self.rack_workloads = workloads
+        if statuses is not None:
+            self.rack_statuses = statuses
+        if flagged is not None:
+            self.flagged_racks = flagged
         
-        self.request_new_map.emit(self.rack_temps)
+        self.render_service.submit(self.rack_temps)
         
     def mouseMoveEvent(self, event):
         rect = self.rect()
@@ -715,12 +699,28 @@ class EnhancedHeatmap(QWidget):
                 painter.drawLine(0, y, rect.width(), y)
         # --- End of Grid Fix ---
 
+        # Outline racks the per-rack models flagged (baseline deviation / forecast)
+        if cell_width > 0 and cell_height > 0 and self.flagged_racks:
+            painter.setBrush(Qt.NoBrush)
+            for rack in self.flagged_racks:
+                if rack >= self.rows * self.cols:
+                    continue
+                critical = rack < len(self.rack_statuses) and self.rack_statuses[rack] >= RackModelBank.STATUS_CRITICAL
+                # White stays visible on every heatmap color; dotted = warning, solid = critical
+                painter.setPen(QPen(QColor("#ECF0F1"), 2, Qt.SolidLine if critical else Qt.DotLine))
+                painter.drawRect(int((rack % self.cols) * cell_width) + 1, int((rack // self.cols) * cell_height) + 1,
+                                 int(cell_width) - 2, int(cell_height) - 2)
+
         # Draw tooltip
         if self.hover_rack >= 0 and self.hover_rack < len(self.rack_temps):
             temp = self.rack_temps[self.hover_rack]
             workload = self.rack_workloads[self.hover_rack] if self.rack_workloads and self.hover_rack < len(self.rack_workloads) else 0
             
             tooltip_text = f"Rack {self.hover_rack + 1}\nTemp: {temp:.1f}°C\nWorkload: {workload:.0f}%"
+            if self.hover_rack < len(self.rack_statuses):
+                tooltip_text += f"\nStatus: {RackModelBank.STATUS_LABELS[self.rack_statuses[self.hover_rack]]}"
+                if self.hover_rack in self.flagged_racks:
+                    tooltip_text += " (ML)"
             
             painter.setFont(QFont("Segoe UI", 9))
             metrics = painter.fontMetrics()
@@ -5,7 +5,9 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QTabWidget,
                              QSizePolicy, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QPainter, QColor, QFont, QBrush, QPen, QPalette
-from ui.dashboard_widgets import MetricGauge, TrendChart, AlertPanel, EnhancedHeatmap
+from ui.dashboard_widgets import MetricGauge, TrendChart, AlertPanel, EnhancedHeatmap, HeatmapRenderService
+from ui.dashboard_updater import DashboardUpdater
+from ml.rack_models import CRITICAL_TEMP_C, WARNING_TEMP_C
 
 
 class StatusIndicator(QLabel):
@@ -148,15 +150,22 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.main_layout.addWidget(self.tabs)
 
+        # One heatmap render per tick, shown by the overview and thermal tabs
+        self.heatmap_service = HeatmapRenderService(rows=20, cols=35)
+
         # Create different views
         self._create_overview_tab()
         self._create_analytics_tab()
         self._create_thermal_tab()
 
+        # Dashboard updates are diffed and applied at most once per frame
+        self.ticks_received = 0
+        self.dashboard_updater = DashboardUpdater(self._dashboard_view_model, self.tabs)
+
     def _create_overview_tab(self):
         """Main overview dashboard with key metrics and controls."""
         
-        overview_tab = QWidget()
+        overview_tab = self.overview_tab = QWidget()
         tab_layout = QVBoxLayout(overview_tab)
         tab_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -184,7 +193,7 @@ class MainWindow(QMainWindow):
         gauges_layout.setContentsMargins(10, 10, 10, 10)
         
         self.pue_gauge = MetricGauge("PUE", 1.0, 3.0, "", 1.6, 1.9, reverse_colors=True)
-        self.temp_gauge = MetricGauge("Max Temp", 20, 50, "°C", 35.5, 37.0, reverse_colors=True)
+        self.temp_gauge = MetricGauge("Max Temp", 20, 50, "°C", WARNING_TEMP_C, CRITICAL_TEMP_C, reverse_colors=True)
         self.power_gauge = MetricGauge("Total Power", 0, 2000, "kW", 1200, 1600, reverse_colors=True)
         
         gauges_layout.addWidget(self.pue_gauge)
@@ -212,7 +221,7 @@ class MainWindow(QMainWindow):
         heatmap_title.setStyleSheet("font-family: 'Segoe UI'; font-size: 13px; font-weight: bold; color: #4D96FF; margin-bottom: 10px;")
         heatmap_layout.addWidget(heatmap_title)
         
-        self.overview_heatmap = EnhancedHeatmap(rows=20, cols=35)
+        self.overview_heatmap = EnhancedHeatmap(rows=20, cols=35, render_service=self.heatmap_service)
         heatmap_layout.addWidget(self.overview_heatmap)
         
         layout.addWidget(heatmap_frame)
@@ -384,7 +393,7 @@ class MainWindow(QMainWindow):
     def _create_analytics_tab(self):
         """Analytics tab with trend charts."""
         
-        analytics_tab = QWidget()
+        analytics_tab = self.analytics_tab = QWidget()
         tab_layout = QVBoxLayout(analytics_tab)
         tab_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -448,7 +457,7 @@ class MainWindow(QMainWindow):
     def _create_thermal_tab(self):
         """Thermal management tab with detailed heatmap."""
         
-        thermal_tab = QWidget()
+        thermal_tab = self.thermal_tab = QWidget()
         tab_layout = QVBoxLayout(thermal_tab)
         tab_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -473,8 +482,9 @@ class MainWindow(QMainWindow):
         legend_label.setStyleSheet("color: #BDC3C7; font-size: 10px; font-weight: bold;")
         legend_layout.addWidget(legend_label)
         
-        for color, label in [("#2ECC71", "Good < 35.5°C"), ("#F1C40F", "Warning 35.5-37°C"),
-                             ("#E74C3C", "Critical > 37°C")]:
+        for color, label in [("#2ECC71", f"Good < {WARNING_TEMP_C:g}°C"),
+                             ("#F1C40F", f"Warning {WARNING_TEMP_C:g}-{CRITICAL_TEMP_C:g}°C"),
+                             ("#E74C3C", f"Critical > {CRITICAL_TEMP_C:g}°C")]:
             color_box = QLabel()
             color_box.setStyleSheet(f"background-color: {color}; border-radius: 3px;")
             color_box.setFixedSize(15, 15)
@@ -487,7 +497,7 @@ class MainWindow(QMainWindow):
         legend_layout.addStretch()
         layout.addLayout(legend_layout)
 
-        self.heatmap = EnhancedHeatmap(rows=20, cols=35)
+        self.heatmap = EnhancedHeatmap(rows=20, cols=35, render_service=self.heatmap_service)
         layout.addWidget(self.heatmap)
 
         stats_frame = QFrame()
@@ -512,15 +522,57 @@ class MainWindow(QMainWindow):
         """Displays the 'Calibrating' message on startup."""
         self.alert_panel.add_alert("ML Engine: CALIBRATING... Please wait.", "info")
         self.insights_label.setText("ML Engine is calibrating...\nThis may take a moment as it learns 'normal' operations.")
+        self.dashboard_updater.invalidate("insights")
 
     def hide_calibration_message(self):
         """Hides the 'Calibrating' message and shows 'Online'."""
         self.alert_panel.add_alert("ML Engine: CALIBRATED. System online.", "good")
 
+    def closeEvent(self, event):
+        self.heatmap_service.shutdown()
+        super().closeEvent(event)
+
     def update_dashboard(self, results, forecasts={}):
         """
         Update all dashboard elements with new simulation results.
+
+        Chart history and alerts are recorded for every tick; everything else
+        is applied through the DashboardUpdater at most once per frame, and
+        only where a value changed on a visible tab.
+        """
+        server_power = results.get('total_server_power_kw', 0)
+        cooling_power = results.get('total_cooling_power_kw', 0)
+        total_power = server_power + cooling_power
+        pue = results.get('average_pue', 0)
+        max_temp = results.get('max_outlet_temp_c', 0)
+        daily_cost = results.get('total_daily_cost_usd', 0)
+        critical_count = results.get('racks_critical', 0)
+
+        self.ticks_received += 1
+        self.pue_chart.add_data_point(pue, repaint=False)
+        self.temp_chart.add_data_point(max_temp, repaint=False)
+        self.power_chart.add_data_point(total_power, repaint=False)
+        self.cost_chart.add_data_point(daily_cost, repaint=False)
+
+        if pue > 2.0: self.alert_panel.add_alert(f"PUE critical at {pue:.2f} - Cooling inefficient", "critical")
+        elif pue > 1.9: self.alert_panel.add_alert(f"PUE elevated at {pue:.2f} - Review cooling", "warning")
+        if max_temp > 40.0: self.alert_panel.add_alert(f"Extreme temperature: {max_temp:.1f}°C - Immediate action required", "critical")
+        elif max_temp > CRITICAL_TEMP_C: self.alert_panel.add_alert(f"Critical temperature: {max_temp:.1f}°C", "critical")
+        elif max_temp > WARNING_TEMP_C: self.alert_panel.add_alert(f"Temperature elevated: {max_temp:.1f}°C", "warning")
+        if critical_count > 50: self.alert_panel.add_alert(f"{critical_count} racks critical - System overload", "critical")
+        elif critical_count > 20: self.alert_panel.add_alert(f"{critical_count} racks in critical state", "warning")
+        if total_power > 1800: self.alert_panel.add_alert(f"Power consumption very high: {total_power:.0f} kW", "critical")
+        elif total_power > 1600: self.alert_panel.add_alert(f"Power consumption elevated: {total_power:.0f} kW", "warning")
+
+        self.dashboard_updater.submit(results, forecasts)
+
+    def _dashboard_view_model(self, results, forecasts):
         """
+        The dashboard state for one result as (key, value, apply, tab page)
+        items, consumed by the DashboardUpdater.
+        """
+        overview, analytics, thermal = self.overview_tab, self.analytics_tab, self.thermal_tab
+
         server_power = results.get('total_server_power_kw', 0)
         cooling_power = results.get('total_cooling_power_kw', 0)
         total_power = server_power + cooling_power
@@ -531,107 +583,89 @@ class MainWindow(QMainWindow):
         strategy = results.get('cooling_strategy', 'N/A')
         temps = results.get('individual_outlet_temps', [])
         workloads = results.get('individual_workloads', [])
+        statuses = results.get('individual_rack_status', [])
+        flagged = results.get('flagged_racks', [])
 
-        self.result_labels["Total Server Power (kW)"].setText(f"{server_power:.1f} kW")
-        self.result_labels["Total Cooling Power (kW)"].setText(f"{cooling_power:.1f} kW")
-        self.result_labels["Average PUE"].setText(f"{pue:.2f}")
-        self.result_labels["MAX Outlet Temp (°C)"].setText(f"{max_temp:.1f}°C")
-        self.result_labels["Total Compute Output"].setText(f"{compute_output:,.0f}")
-        self.result_labels["Projected Daily Cost (USD)"].setText(f"${daily_cost:,.0f}")
-        
         clean_strategy = strategy.replace("[bold red]", "").replace("[bold red]", "")
         clean_strategy = clean_strategy.replace("[bold yellow]", "").replace("[bold yellow]", "")
         clean_strategy = clean_strategy.replace("[bold green]", "").replace("[bold green]", "")
-        self.result_labels["Cooling Strategy"].setText(clean_strategy)
 
-        self.pue_gauge.set_value(pue)
-        self.temp_gauge.set_value(max_temp)
-        self.power_gauge.set_value(total_power)
+        for name, text in (("Total Server Power (kW)", f"{server_power:.1f} kW"),
+                           ("Total Cooling Power (kW)", f"{cooling_power:.1f} kW"),
+                           ("Average PUE", f"{pue:.2f}"),
+                           ("MAX Outlet Temp (°C)", f"{max_temp:.1f}°C"),
+                           ("Total Compute Output", f"{compute_output:,.0f}"),
+                           ("Projected Daily Cost (USD)", f"${daily_cost:,.0f}"),
+                           ("Cooling Strategy", clean_strategy)):
+            yield ("result", name), text, self.result_labels[name].setText, overview
+
+        yield "pue_gauge", pue, self.pue_gauge.set_value, overview
+        yield "temp_gauge", max_temp, self.temp_gauge.set_value, overview
+        yield "power_gauge", total_power, self.power_gauge.set_value, overview
 
         pue_status = "good" if pue < 1.6 else "warning" if pue < 1.9 else "critical"
         pue_text = "✓ Excellent" if pue_status == "good" else "⚠ Fair" if pue_status == "warning" else "✗ Poor"
-        self.status_indicators["Average PUE"][0].update_status(pue_status, pue_text)
-
-        temp_status = "good" if max_temp < 35.5 else "warning" if max_temp < 37 else "critical"
+        temp_status = "good" if max_temp < WARNING_TEMP_C else "warning" if max_temp < CRITICAL_TEMP_C else "critical"
         temp_text = "✓ Normal" if temp_status == "good" else "⚠ High" if temp_status == "warning" else "✗ Critical"
-        self.status_indicators["MAX Outlet Temp (°C)"][0].update_status(temp_status, temp_text)
-
         power_status = "good" if total_power < 1200 else "warning" if total_power < 1600 else "critical"
         power_text = "✓ Normal" if power_status == "good" else "⚠ High" if power_status == "warning" else "✗ Very High"
-        self.status_indicators["Total Server Power (kW)"][0].update_status(power_status, power_text)
-        self.status_indicators["Total Cooling Power (kW)"][0].update_status(power_status, power_text)
-        
-        self.status_indicators["Total Compute Output"][0].update_status("neutral", "")
-        self.status_indicators["Projected Daily Cost (USD)"][0].update_status("neutral", "")
-        self.status_indicators["Cooling Strategy"][0].update_status("neutral", "")
-
-        self.heatmap.update_data(temps, workloads)
-        self.overview_heatmap.update_data(temps, workloads)
-
-        self.pue_chart.add_data_point(pue)
-        self.temp_chart.add_data_point(max_temp)
-        self.power_chart.add_data_point(total_power)
-        self.cost_chart.add_data_point(daily_cost)
-
-        if forecasts:
-            self.pue_chart.update_forecast_data(forecasts.get('pue', []))
-            self.temp_chart.update_forecast_data(forecasts.get('temp', []))
-            self.power_chart.update_forecast_data(forecasts.get('power', []))
-            self.cost_chart.update_forecast_data(forecasts.get('cost', []))
+        for name, status in (("Average PUE", (pue_status, pue_text)),
+                             ("MAX Outlet Temp (°C)", (temp_status, temp_text)),
+                             ("Total Server Power (kW)", (power_status, power_text)),
+                             ("Total Cooling Power (kW)", (power_status, power_text)),
+                             ("Total Compute Output", ("neutral", "")),
+                             ("Projected Daily Cost (USD)", ("neutral", "")),
+                             ("Cooling Strategy", ("neutral", ""))):
+            indicator = self.status_indicators[name][0]
+            yield ("status", name), status, lambda value, indicator=indicator: indicator.update_status(*value), overview
+
+        heatmap_data = (temps, workloads, statuses, flagged)
+        yield "overview_heatmap", heatmap_data, lambda data: self.overview_heatmap.update_data(*data), overview
+        yield "thermal_heatmap", heatmap_data, lambda data: self.heatmap.update_data(*data), thermal
+
+        # Points are added every tick; the charts repaint once per frame while shown
+        charts = {'pue': self.pue_chart, 'temp': self.temp_chart, 'power': self.power_chart, 'cost': self.cost_chart}
+        for name, chart in charts.items():
+            yield ("chart", name), self.ticks_received, lambda _ticks, chart=chart: chart.update(), analytics
+            if forecasts:
+                yield ("forecast", name), forecasts.get(name, []), chart.update_forecast_data, analytics
 
         if temps:
-            avg_temp = sum(temps) / len(temps) if temps else 0
-            hottest_idx = temps.index(max(temps)) if temps else 0
-            coldest_idx = temps.index(min(temps)) if temps else 0
-            warning_count = sum(1 for t in temps if 35.5 <= t < 37.0)
-            critical_count = sum(1 for t in temps if t >= 37.0)
-
-            self.thermal_stats_labels["Hottest Rack"].setText(f"#{hottest_idx + 1} ({max(temps) if temps else 'N/A':.1f}°C)")
-            self.thermal_stats_labels["Coldest Rack"].setText(f"#{coldest_idx + 1} ({min(temps) if temps else 'N/A':.1f}°C)")
-            self.thermal_stats_labels["Avg Temp"].setText(f"{avg_temp:.1f}°C")
-            
-            warning_label = self.thermal_stats_labels["Racks in Warning"]
-            warning_label.setText(f"{warning_count}")
-            warning_label.setStyleSheet(f"font-size: 11px; color: {'#F39C12' if warning_count > 50 else '#ECF0F1'}; font-weight: bold;")
-            
-            critical_label = self.thermal_stats_labels["Racks Critical"]
-            critical_label.setText(f"{critical_count}")
+            # Fleet statistics come precomputed by the engine's FleetAggregator
+            warning_count = results.get('racks_warning', 0)
+            critical_count = results.get('racks_critical', 0)
             if critical_count > 20:
-                critical_label.setStyleSheet("font-size: 11px; color: #E74C3C; font-weight: bold;")
+                critical_style = "font-size: 11px; color: #E74C3C; font-weight: bold;"
             elif critical_count > 0:
-                critical_label.setStyleSheet("font-size: 11px; color: #F39C12; font-weight: bold;")
+                critical_style = "font-size: 11px; color: #F39C12; font-weight: bold;"
             else:
-                critical_label.setStyleSheet("font-size: 11px; color: #2ECC71; font-weight: bold;")
-
-        if pue > 2.0: self.alert_panel.add_alert(f"PUE critical at {pue:.2f} - Cooling inefficient", "critical")
-        elif pue > 1.9: self.alert_panel.add_alert(f"PUE elevated at {pue:.2f} - Review cooling", "warning")
-        if max_temp > 40.0: self.alert_panel.add_alert(f"Extreme temperature: {max_temp:.1f}°C - Immediate action required", "critical")
-        elif max_temp > 37.0: self.alert_panel.add_alert(f"Critical temperature: {max_temp:.1f}°C", "critical")
-        elif max_temp > 35.5: self.alert_panel.add_alert(f"Temperature elevated: {max_temp:.1f}°C", "warning")
-        if critical_count > 50: self.alert_panel.add_alert(f"{critical_count} racks critical - System overload", "critical")
-        elif critical_count > 20: self.alert_panel.add_alert(f"{critical_count} racks in critical state", "warning")
-        if total_power > 1800: self.alert_panel.add_alert(f"Power consumption very high: {total_power:.0f} kW", "critical")
-        elif total_power > 1600: self.alert_panel.add_alert(f"Power consumption elevated: {total_power:.0f} kW", "warning")
-
-        if hasattr(self, 'insights_label'):
-             # Logic to update insights label
-            if "ML Engine is calibrating" in self.insights_label.text() and len(forecasts) > 0:
-                 self.insights_label.setText("ML Engine is online. Analyzing performance...")
+                critical_style = "font-size: 11px; color: #2ECC71; font-weight: bold;"
+            warning_style = f"font-size: 11px; color: {'#F39C12' if warning_count > 50 else '#ECF0F1'}; font-weight: bold;"
+
+            labels = self.thermal_stats_labels
+            for name, text in (("Hottest Rack", f"#{results.get('hottest_rack', 0) + 1} ({max_temp:.1f}°C)"),
+                               ("Coldest Rack", f"#{results.get('coldest_rack', 0) + 1} ({results.get('min_outlet_temp_c', 0):.1f}°C)"),
+                               ("Avg Temp", f"{results.get('avg_outlet_temp_c', 0):.1f}°C"),
+                               ("Racks in Warning", f"{warning_count}"),
+                               ("Racks Critical", f"{critical_count}")):
+                yield ("thermal", name), text, labels[name].setText, thermal
+            yield ("thermal_style", "Racks in Warning"), warning_style, labels["Racks in Warning"].setStyleSheet, thermal
+            yield ("thermal_style", "Racks Critical"), critical_style, labels["Racks Critical"].setStyleSheet, thermal
+
+        if len(forecasts) > 0: # Only show insights if ML is running
+            efficiency_score = 100 - ((pue - 1.0) * 50)
+            thermal_score = 100 - max(0, (max_temp - 30) * 5)
+            overall_score = (efficiency_score + thermal_score) / 2
+
+            insights = f"Overall Efficiency Score: {overall_score:.0f}/100\n\n"
+            insights += f"• PUE Efficiency: {efficiency_score:.0f}/100 "
+            insights += f"({'Excellent' if pue < 1.6 else 'Good' if pue < 1.8 else 'Needs Improvement'})\n"
+            insights += f"• Thermal Management: {thermal_score:.0f}/100 "
+            insights += f"({'Optimal' if max_temp < 35 else 'Acceptable' if max_temp < CRITICAL_TEMP_C else 'Critical'})\n"
+            insights += f"• Estimated Annual Cost: ${daily_cost * 365:,.0f}\n\n"
+            
+            if pue > 1.8: insights += "💡 Recommendation: Reduce cooling overhead or optimize airflow.\n"
+            if max_temp > 36: insights += "💡 Recommendation: Increase cooling capacity or reduce workload on hot racks.\n"
+            if overall_score > 80: insights += "✓ Datacenter is operating efficiently!"
             
-            if len(forecasts) > 0: # Only show insights if ML is running
-                efficiency_score = 100 - ((pue - 1.0) * 50)
-                thermal_score = 100 - max(0, (max_temp - 30) * 5)
-                overall_score = (efficiency_score + thermal_score) / 2
-
-                insights = f"Overall Efficiency Score: {overall_score:.0f}/100\n\n"
-                insights += f"• PUE Efficiency: {efficiency_score:.0f}/100 "
-                insights += f"({'Excellent' if pue < 1.6 else 'Good' if pue < 1.8 else 'Needs Improvement'})\n"
-                insights += f"• Thermal Management: {thermal_score:.0f}/100 "
-                insights += f"({'Optimal' if max_temp < 35 else 'Acceptable' if max_temp < 37 else 'Critical'})\n"
-                insights += f"• Estimated Annual Cost: ${daily_cost * 365:,.0f}\n\n"
-                
-                if pue > 1.8: insights += "💡 Recommendation: Reduce cooling overhead or optimize airflow.\n"
-                if max_temp > 36: insights += "💡 Recommendation: Increase cooling capacity or reduce workload on hot racks.\n"
-                if overall_score > 80: insights += "✓ Datacenter is operating efficiently!"
-                
-                self.insights_label.setText(insights)
\ No newline at end of file
+            yield "insights", insights, self.insights_label.setText, analytics
@@ -3,11 +3,16 @@ import websockets
 import threading
 import json
 
+from ml.rack_models import RackModelBank
+from ui.colormap import HEATMAP_LUT
+
 class UnityBridge:
     def __init__(self, port=8765):
         self.port = port
         self.loop = asyncio.new_event_loop()
         self.clients = set()
+        # Sent once per client; ticks then carry palette indices instead of colours
+        self.palette_message = json.dumps({"type": "palette", "palette": HEATMAP_LUT.export()})
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
         print(f"Unity Bridge started on port {port}")
@@ -30,6 +35,7 @@ class UnityBridge:
         print("Unity Client Connected")
         self.clients.add(websocket)
         try:
+            await websocket.send(self.palette_message)
             await websocket.wait_closed()
         except:
             pass
@@ -48,6 +54,32 @@ class UnityBridge:
         # Schedule the send in the event loop
         asyncio.run_coroutine_threadsafe(self._broadcast(json_data), self.loop)
 
+    def send_tick(self, tick):
+        """
+        SimulationEngine subscriber: converts a published tick into the rack
+        list Unity expects and sends it.
+        """
+        if not self.clients:
+            return
+
+        # Status comes from the per-rack models (thresholds + baseline deviation + forecast)
+        labels = RackModelBank.STATUS_LABELS
+        color_indices = HEATMAP_LUT.indices(tick["outlet_temps"]).tolist()
+        unity_racks = []
+        for i, (temp, energy, status, color_index) in enumerate(zip(tick["outlet_temps"].tolist(),
+                                                                    tick["server_powers"].tolist(),
+                                                                    tick["rack_status"].tolist(), color_indices)):
+            unity_racks.append({
+                "id": f"Rack_{i}",
+                "index": i,
+                "temperature": temp,
+                "energy_usage": energy,
+                "status": labels[status],
+                "color_index": color_index # Into the palette sent on connect
+            })
+
+        self.send_update({"type": "tick", "racks": unity_racks})
+
     async def _broadcast(self, message):
         if self.clients:
             # Send to all clients, ignoring errors from disconnected ones
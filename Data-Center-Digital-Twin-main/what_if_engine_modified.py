@@ -1,7 +1,7 @@
 import sys
-import random
 import math
 import warnings
+import numpy as np
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QTimer # Removed QThread
 
@@ -12,8 +12,11 @@ warnings.filterwarnings("ignore")
 # --- Import from our project files ---
 from ui.main_window import MainWindow
 from data_pipeline import ScenarioCombinator, DataIngestor
-from twin.digital_twin_engine import compute_results
+from twin.digital_twin_engine import compute_batch
+from simulation.aggregation import FleetAggregator
 from simulation.dynamics import StateRandomizer
+from simulation.rack_state import RackStateArray
+from ml.rack_models import CRITICAL_TEMP_C, WARNING_TEMP_C
 from ml_engine import MLEngine            
 # from ml_worker import MLCalibrationWorker # REMOVED
 
@@ -27,9 +30,11 @@ class WhatIfEngineController:
     
     def __init__(self):
         print("Initializing components...")
-        self.combinator = ScenarioCombinator()
         self.ingestor = DataIngestor()
+        self.combinator = ScenarioCombinator(num_machines=len(self.ingestor.machine_ids))
         self.randomizer = StateRandomizer()
+        self.rack_state = RackStateArray(self.ingestor.machine_ids) # Reused every tick
+        self.aggregator = FleetAggregator()
         self.current_ambient_temp = 25.0 
         
         # --- NEW: Initialize Unity Bridge ---
@@ -141,9 +146,9 @@ class WhatIfEngineController:
         self.simulation_step += 1
         
         plan = self.combinator.generate_random_combination_plan()
-        baseline_state = self.ingestor.get_state_from_plan(plan)
-        baseline_payloads = [rack['payload'] for rack in baseline_state]
-        varied_payloads = self.randomizer.apply_natural_variation(baseline_payloads)
+        state = self.ingestor.get_state_from_plan(plan, out=self.rack_state)
+        self.randomizer.apply_natural_variation(state)
+        if len(state) == 0: return
 
         is_workload_override = self.view.workload_slider['checkbox'].isChecked()
         is_inlet_override = self.view.inlet_slider['checkbox'].isChecked()
@@ -156,33 +161,31 @@ class WhatIfEngineController:
         if is_ambient_override:
             self.current_ambient_temp = override_ambient
         else:
-            if varied_payloads: # Ensure list is not empty
-                self.current_ambient_temp = sum(p['ambient_temp_c'] for p in varied_payloads) / len(varied_payloads)
+            self.current_ambient_temp = float(state.ambient.mean())
 
-        final_payloads = []
-        for payload in varied_payloads:
-            if is_workload_override: payload['server_workload_percent'] = max(0, min(100, override_workload + random.uniform(-2, 2)))
-            if is_inlet_override: payload['inlet_temp_c'] = override_inlet
-            if is_ambient_override: payload['ambient_temp_c'] = override_ambient
-            final_payloads.append(payload)
+        # Overrides are written straight into the state arrays
+        if is_workload_override:
+            np.clip(override_workload + np.random.uniform(-2, 2, len(state)), 0, 100, out=state.workload)
+        if is_inlet_override: state.inlet.fill(override_inlet)
+        if is_ambient_override: state.ambient.fill(override_ambient)
 
-        individual_results = [compute_results(p) for p in final_payloads]
-        if not individual_results: return
+        results = compute_batch(state)
+        outlet_temps = results['outlet_temp_c']
         
         # --- NEW: Send Data to Unity ---
         # We process the results to match the JSON structure Unity expects
         unity_racks = []
-        for i, res in enumerate(individual_results):
-            temp = res['outlet_temp_c']
+        for i, (temp, energy) in enumerate(zip(outlet_temps.tolist(),
+                                               results['calculated_server_power_watts'].tolist())):
             status = "Normal"
-            if temp > 37.0: status = "Critical"
-            elif temp > 35.5: status = "Warning"
+            if temp > CRITICAL_TEMP_C: status = "Critical"
+            elif temp > WARNING_TEMP_C: status = "Warning"
             
             rack_data = {
                 "id": f"Rack_{i}",
                 "index": i,
                 "temperature": temp,
-                "energy_usage": res['calculated_server_power_watts'],
+                "energy_usage": energy,
                 "status": status
             }
             unity_racks.append(rack_data)
@@ -191,27 +194,10 @@ class WhatIfEngineController:
         self.unity_bridge.send_update({"racks": unity_racks})
         # -------------------------------
         
-        total_server_power_w = sum(r['calculated_server_power_watts'] for r in individual_results)
-        total_cooling_power_w = sum(r['cooling_unit_power_watts'] for r in individual_results)
-        total_facility_power_w = total_server_power_w + total_cooling_power_w
-        avg_pue = total_facility_power_w / total_server_power_w if total_server_power_w > 0 else 0
-        
-        # These lines are now in the correct order
-        max_outlet_temp = max(r['outlet_temp_c'] for r in individual_results)
-        hottest_result = max(individual_results, key=lambda r: r['temp_deviation_c'])
-        strategy = hottest_result.get('cooling_strategy', "STABLE")
-        total_compute_output = sum(r['compute_output'] for r in individual_results)
-
         aggregated_results = {
-            "total_server_power_kw": total_server_power_w / 1000,
-            "total_cooling_power_kw": total_cooling_power_w / 1000,
-            "average_pue": avg_pue,
-            "max_outlet_temp_c": max_outlet_temp, # <-- THIS IS THE FIX
-            "total_daily_cost_usd": (total_facility_power_w / 1000 * 0.12 * 24),
-            "cooling_strategy": strategy,
-            "individual_outlet_temps": [r['outlet_temp_c'] for r in individual_results],
-            "individual_workloads": [p['server_workload_percent'] for p in final_payloads],
-            "total_compute_output": total_compute_output
+            **self.aggregator.aggregate(results),
+            "individual_outlet_temps": outlet_temps.tolist(),
+            "individual_workloads": state.workload.tolist(),
         }
         
         # --- NEW ML LOGIC ---